@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from estadisticas import Estadisticas, registrar
+from matriz_notas import NOTA_APROBADO, MatrizNotas
+
+RUTA = Path(os.environ.get("ACTAS_DB", Path.home() / ".local" / "share" / "analizador-notas" / "evaluaciones.sqlite"))
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS evaluaciones (
+    id INTEGER PRIMARY KEY,
+    centro TEXT NOT NULL, curso TEXT NOT NULL, grupo TEXT NOT NULL, evaluacion TEXT NOT NULL,
+    fecha TEXT NOT NULL, alumnos INTEGER, media REAL, res TEXT NOT NULL,
+    UNIQUE (centro, curso, grupo, evaluacion)
+);
+CREATE TABLE IF NOT EXISTS notas (
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL, alumno TEXT NOT NULL, materia TEXT NOT NULL, nota REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats_alumnos (
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id) ON DELETE CASCADE,
+    alumno TEXT NOT NULL, suspensos INTEGER NOT NULL, media REAL
+);
+CREATE TABLE IF NOT EXISTS stats_materias (
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL, materia TEXT NOT NULL, total INTEGER NOT NULL, aprobados INTEGER NOT NULL,
+    suspensos INTEGER NOT NULL, media REAL, pct_aprobados REAL, pct_suspensos REAL
+);
+CREATE INDEX IF NOT EXISTS idx_notas_evaluacion ON notas (evaluacion_id, posicion);
+CREATE INDEX IF NOT EXISTS idx_stats_alumnos_alumno ON stats_alumnos (alumno, evaluacion_id);
+CREATE INDEX IF NOT EXISTS idx_stats_alumnos_evaluacion ON stats_alumnos (evaluacion_id);
+CREATE INDEX IF NOT EXISTS idx_stats_materias_materia ON stats_materias (materia, evaluacion_id);
+CREATE INDEX IF NOT EXISTS idx_stats_materias_evaluacion ON stats_materias (evaluacion_id, posicion);
+"""
+
+_lock = threading.Lock()
+_iniciadas = set()
+
+
+# --- CONEXIÓN ---
+def _conectar(ruta=None):
+    ruta = Path(ruta or RUTA)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    # Varios procesos (procesar_centro) pueden guardar a la vez: WAL y espera en lugar de "database is locked"
+    con = sqlite3.connect(ruta, timeout=30)
+    con.execute("PRAGMA foreign_keys = ON")
+    with _lock:
+        if ruta not in _iniciadas:
+            con.execute("PRAGMA journal_mode = WAL")
+            con.executescript(_ESQUEMA)
+            _iniciadas.add(ruta)
+    return con
+
+# --- ESCRITURA ---
+def guardar(centro, curso, grupo, evaluacion, est, ruta=None):
+    """Guarda las notas limpias y las estadísticas de ``est``; sustituye la evaluación si ya existía.
+
+    Devuelve el ``id`` de la evaluación.
+    """
+    res = json.dumps(est.res, default=float)
+    with closing(_conectar(ruta)) as con, con:
+        (id_,) = con.execute(
+            "INSERT INTO evaluaciones (centro, curso, grupo, evaluacion, fecha, alumnos, media, res) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (centro, curso, grupo, evaluacion) DO UPDATE SET "
+            "fecha = excluded.fecha, alumnos = excluded.alumnos, media = excluded.media, res = excluded.res "
+            "RETURNING id",
+            (centro, curso, grupo, evaluacion, datetime.now().isoformat(timespec='seconds'),
+             int(est.res['total_alumnos']), float(est.res['media_grupo']), res)).fetchone()
+        for tabla in ("notas", "stats_alumnos", "stats_materias"):
+            con.execute(f"DELETE FROM {tabla} WHERE evaluacion_id = ?", (id_,))
+        # tolist() convierte a tipos de Python: sqlite3 no acepta np.int64
+        d = est.df
+        con.executemany("INSERT INTO notas VALUES (?, ?, ?, ?, ?)",
+                        zip([id_] * len(d), range(len(d)), d['Alumno'].tolist(), d['Materia'].tolist(), d['Nota'].tolist()))
+        s = est.stats_al
+        con.executemany("INSERT INTO stats_alumnos VALUES (?, ?, ?, ?)",
+                        zip([id_] * len(s), s['Alumno'].tolist(), s['Suspensos'].tolist(), s['Media'].tolist()))
+        m = est.stats_mat
+        con.executemany("INSERT INTO stats_materias VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        zip([id_] * len(m), range(len(m)), *(m[c].tolist() for c in
+                            ['Materia', 'Total', 'Aprobados', 'Suspensos', 'Media', 'Pct_Aprobados', 'Pct_Suspensos'])))
+    return id_
+
+def borrar(id_, ruta=None):
+    with closing(_conectar(ruta)) as con, con:
+        con.execute("DELETE FROM evaluaciones WHERE id = ?", (id_,))
+
+# --- LECTURA ---
+def listar(centro=None, curso=None, grupo=None, ruta=None):
+    """Evaluaciones guardadas (sin notas), de la más reciente a la más antigua."""
+    filtros = {k: v for k, v in (('centro', centro), ('curso', curso), ('grupo', grupo)) if v is not None}
+    where = " AND ".join(f"{k} = ?" for k in filtros) or "1"
+    with closing(_conectar(ruta)) as con:
+        return pd.read_sql_query(
+            f"SELECT id, centro, curso, grupo, evaluacion, fecha, alumnos, media FROM evaluaciones "
+            f"WHERE {where} ORDER BY fecha DESC, id DESC", con, params=tuple(filtros.values()))
+
+def cargar(id_, ruta=None):
+    """Reconstruye el ``Estadisticas`` guardado sin recalcular nada.
+
+    Devuelve ``(datos, est)``: ``datos`` es el acta Alumno/Materia/Nota para
+    ``st.session_state.data``; ``est`` queda registrado en la caché de ``estadisticas``
+    para que ``calcular(datos)`` lo devuelva directamente.
+    """
+    with closing(_conectar(ruta)) as con:
+        fila = con.execute("SELECT res FROM evaluaciones WHERE id = ?", (id_,)).fetchone()
+        if fila is None: raise KeyError(f"No existe la evaluación {id_}")
+        df = pd.read_sql_query("SELECT alumno AS Alumno, materia AS Materia, nota AS Nota FROM notas "
+                               "WHERE evaluacion_id = ? ORDER BY posicion", con, params=(id_,))
+        stats_al = pd.read_sql_query("SELECT alumno AS Alumno, suspensos AS Suspensos, media AS Media FROM stats_alumnos "
+                                     "WHERE evaluacion_id = ? ORDER BY alumno", con, params=(id_,))
+        stats_mat = pd.read_sql_query(
+            "SELECT materia AS Materia, total AS Total, aprobados AS Aprobados, suspensos AS Suspensos, media AS Media, "
+            "pct_aprobados AS Pct_Aprobados, pct_suspensos AS Pct_Suspensos FROM stats_materias "
+            "WHERE evaluacion_id = ? ORDER BY posicion", con, params=(id_,))
+    res = json.loads(fila[0])
+    datos = df.copy()
+    df['Aprobado'] = df['Nota'] >= NOTA_APROBADO
+    matriz = MatrizNotas.desde_largo(df)
+    est = Estadisticas(df, matriz.alumnos.to_numpy(dtype=object), stats_al, stats_mat, res, matriz)
+    registrar(datos, est)
+    return datos, est
+
+# --- EVOLUCIÓN ---
+def _evolucion(sql, centro, curso, grupo, ruta, clave, valor):
+    with closing(_conectar(ruta)) as con:
+        df = pd.read_sql_query(sql, con, params=(centro, curso, grupo))
+    # Evaluaciones en el orden en que se guardaron por primera vez (id creciente)
+    df['Evaluacion'] = pd.Categorical(df['Evaluacion'], categories=list(dict.fromkeys(df['Evaluacion'])), ordered=True)
+    df['Cambio'] = df.groupby(clave, sort=False)[valor].diff()
+    return df
+
+def evolucion_alumnos(centro, curso, grupo, ruta=None):
+    """Media de cada alumno en cada evaluación del grupo y su cambio respecto a la anterior."""
+    return _evolucion(
+        "SELECT e.evaluacion AS Evaluacion, s.alumno AS Alumno, s.media AS Media, s.suspensos AS Suspensos "
+        "FROM evaluaciones e JOIN stats_alumnos s ON s.evaluacion_id = e.id "
+        "WHERE e.centro = ? AND e.curso = ? AND e.grupo = ? ORDER BY e.id", centro, curso, grupo, ruta, 'Alumno', 'Media')
+
+def evolucion_materias(centro, curso, grupo, ruta=None):
+    """Porcentaje de aprobados de cada materia en cada evaluación y su cambio respecto a la anterior."""
+    return _evolucion(
+        "SELECT e.evaluacion AS Evaluacion, m.materia AS Materia, m.pct_aprobados AS Pct_Aprobados, m.media AS Media "
+        "FROM evaluaciones e JOIN stats_materias m ON m.evaluacion_id = e.id "
+        "WHERE e.centro = ? AND e.curso = ? AND e.grupo = ? ORDER BY e.id", centro, curso, grupo, ruta, 'Materia', 'Pct_Aprobados')
@@ -0,0 +1,141 @@
+"""Mide por separado cada etapa del análisis de actas con datos sintéticos.
+
+    python -m benchmarks.ejecutar --alumnos 30 --materias 10 --paginas 2
+    python -m benchmarks.ejecutar --referencia benchmarks/resultados_anteriores.json
+
+Escribe un JSON con la mediana y el mínimo de cada etapa y lo compara con los
+umbrales de ``benchmarks/umbrales.json`` (y, si se indica, con una ejecución de
+referencia). Además repite el pipeline una vez con cada configuración de
+``completitud`` (p. ej. más de 400 alumnos, con nombres numerados) solo para
+comprobar que no se pierden filas ni alumnos. Sale con código 1 si alguna etapa
+supera su umbral o faltan datos.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import estadisticas
+import extraccion
+import graficos
+import informes
+import procesos
+from benchmarks import generar_actas, mock_openai
+
+UMBRALES = Path(__file__).with_name("umbrales.json")
+
+
+def _medir(funcion, repeticiones):
+    tiempos, resultado = [], None
+    for _ in range(repeticiones):
+        t = time.perf_counter(); resultado = funcion(); tiempos.append(time.perf_counter() - t)
+    return {'mediana_s': statistics.median(tiempos), 'min_s': min(tiempos)}, resultado
+
+def _limpiar_graficos():
+    for nombre in dir(graficos):
+        f = getattr(graficos, nombre)
+        if nombre.startswith("png_") and hasattr(f, "cache_clear"): f.cache_clear()
+
+def ejecutar(alumnos=30, materias=10, paginas=2, repeticiones=3, latencia=0.0):
+    df_largo = generar_actas.datos_sinteticos(alumnos, materias)
+    xlsx, pdf, docx_ = generar_actas.acta_xlsx(df_largo), generar_actas.acta_pdf(df_largo, paginas), generar_actas.acta_docx(df_largo)
+    srv = mock_openai.iniciar(latencia=latencia)
+    client = extraccion.crear_cliente("mock", mock_openai.url(srv))
+    etapas = {}
+    try:
+        etapas['lectura_xlsx'], _ = _medir(lambda: pd.read_excel(io.BytesIO(xlsx)), repeticiones)
+        etapas['texto_pdf'], _ = _medir(lambda: extraccion.get_pdf_text_content(io.BytesIO(pdf)), repeticiones)
+        etapas['tablas_pdf'], (df_pdf, _) = _medir(lambda: extraccion.analizar_pdf(pdf), repeticiones)
+        etapas['texto_docx'], texto = _medir(lambda: extraccion.extract_text_from_docx(io.BytesIO(docx_)), repeticiones)
+        etapas['ia_docx'], df_ia = _medir(lambda: extraccion.process_data_with_ai(texto, "mock", "acta.docx", client=client), repeticiones)
+        etapas['estadisticas'], est = _medir(lambda: estadisticas._calcular(df_ia), repeticiones)
+        res, stats_mat = est.res, est.stats_mat
+
+        def _graficos():
+            _limpiar_graficos()
+            return graficos.graficos_informe_global(res, stats_mat), graficos.graficos_padres(res, stats_mat)
+        etapas['graficos'], (plots, (png_p1, png_p2)) = _medir(_graficos, repeticiones)
+        etapas['informe_global'], _ = _medir(lambda: informes.generate_global_report(
+            res, [io.BytesIO(p.getvalue()) for p in plots], stats_mat, "IES Benchmark", "1º BACH", est.stats_al), repeticiones)
+        etapas['informe_padres'], _ = _medir(lambda: informes.generate_parents_report(
+            res, stats_mat, io.BytesIO(png_p1), io.BytesIO(png_p2)), repeticiones)
+        etapas['informe_todos'], _ = _medir(lambda: informes.generar_informe_todos_alumnos(
+            est.df, est.stats_al, stats_mat, est.orden_alumnos), repeticiones)
+        etapas['zip_alumnos'], _ = _medir(lambda: informes.generar_zip_alumnos(
+            est.df, est.stats_al, stats_mat, est.orden_alumnos), repeticiones)
+    finally:
+        srv.shutdown()
+
+    # Comprobación de que los datos sintéticos atraviesan el pipeline completos
+    esperadas = alumnos * materias
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'entorno': {'python': platform.python_version(), 'plataforma': platform.platform(), 'nucleos': procesos.NUCLEOS},
+        'parametros': {'alumnos': alumnos, 'materias': materias, 'paginas': paginas,
+                       'repeticiones': repeticiones, 'latencia': latencia},
+        'filas': {'esperadas': esperadas, 'tablas_pdf': len(df_pdf), 'ia_docx': len(df_ia), 'estadisticas': len(est.df)},
+        'alumnos': {'esperados': alumnos, 'estadisticas': int(est.res['total_alumnos'])},
+        'etapas': etapas,
+    }
+
+def comparar(resultado, umbrales, referencia=None):
+    """Lista de regresiones: etapas por encima de su máximo o de ``tolerancia`` × referencia."""
+    regresiones = []
+    for etapa, medida in resultado['etapas'].items():
+        maximo = umbrales.get('max_segundos', {}).get(etapa)
+        if maximo is not None and medida['mediana_s'] > maximo:
+            regresiones.append(f"{etapa}: {medida['mediana_s']:.3f}s > máximo {maximo:.3f}s")
+        if referencia and etapa in referencia.get('etapas', {}):
+            limite = referencia['etapas'][etapa]['mediana_s'] * umbrales.get('tolerancia_referencia', 1.5)
+            if medida['mediana_s'] > limite:
+                regresiones.append(f"{etapa}: {medida['mediana_s']:.3f}s > {limite:.3f}s (referencia)")
+    for etapa, n in resultado['filas'].items():
+        if etapa != 'esperadas' and n != resultado['filas']['esperadas']:
+            regresiones.append(f"{etapa}: {n} filas extraídas de {resultado['filas']['esperadas']}")
+    for etapa, n in resultado.get('alumnos', {}).items():
+        if etapa != 'esperados' and n != resultado['alumnos']['esperados']:
+            regresiones.append(f"{etapa}: {n} alumnos de {resultado['alumnos']['esperados']}")
+    return regresiones
+
+def main(argv=None):
+    umbrales = json.loads(UMBRALES.read_text(encoding="utf-8"))
+    defecto = umbrales.get('parametros', {})
+    completitud = umbrales.get('completitud', [])
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del analizador de actas.")
+    parser.add_argument("--alumnos", type=int, default=defecto.get('alumnos', 30))
+    parser.add_argument("--materias", type=int, default=defecto.get('materias', 10))
+    parser.add_argument("--paginas", type=int, default=defecto.get('paginas', 2))
+    parser.add_argument("--repeticiones", type=int, default=defecto.get('repeticiones', 3))
+    parser.add_argument("--latencia", type=float, default=defecto.get('latencia', 0.0), help="latencia simulada del modelo (s)")
+    parser.add_argument("--salida", default="benchmarks/resultados.json")
+    parser.add_argument("--referencia", help="JSON de una ejecución anterior con la que comparar")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args.alumnos, args.materias, args.paginas, args.repeticiones, args.latencia)
+    # Los máximos absolutos solo tienen sentido con los parámetros para los que se fijaron
+    mismos = all(resultado['parametros'][k] == v for k, v in defecto.items())
+    referencia = json.loads(Path(args.referencia).read_text(encoding="utf-8")) if args.referencia else None
+    if not mismos: umbrales = {'tolerancia_referencia': umbrales.get('tolerancia_referencia', 1.5)}
+    resultado['regresiones'] = comparar(resultado, umbrales, referencia)
+    resultado['completitud'] = []
+    for parametros in completitud:
+        extra = ejecutar(**{**parametros, 'repeticiones': 1})
+        sufijo = f" [{extra['parametros']['alumnos']} alumnos]"
+        resultado['completitud'].append({k: extra[k] for k in ('parametros', 'filas', 'alumnos')})
+        resultado['regresiones'] += [r + sufijo for r in comparar(extra, {})]
+    Path(args.salida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    for etapa, medida in resultado['etapas'].items():
+        print(f"{etapa:<16} {medida['mediana_s']*1000:9.1f} ms  (mín {medida['min_s']*1000:.1f} ms)")
+    for r in resultado['regresiones']: print(f"REGRESIÓN  {r}", file=sys.stderr)
+    return 1 if resultado['regresiones'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Generador de actas sintéticas (XLSX, PDF y DOCX) para las pruebas de rendimiento.
+
+Los formatos imitan lo que consume la aplicación: el XLSX en formato largo que lee
+``pd.read_excel``, un PDF con una tabla alumnos × materias por página (legible por
+``analizar_pdf``) y un DOCX con líneas "1. APELLIDOS, NOMBRE  nota nota ..." que
+solo puede interpretar el modelo.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import docx
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+MATERIAS = ["LEN", "MAT", "ING", "FIS", "QUI", "HIS", "FIL", "EF", "BIO", "DIB", "TIC", "FRA"]
+APELLIDOS = ["GARCIA", "LOPEZ", "MARTIN", "SANCHEZ", "PEREZ", "GOMEZ", "RUIZ", "DIAZ", "MORENO", "MUÑOZ",
+             "ALVAREZ", "ROMERO", "TORRES", "NAVARRO", "DOMINGUEZ", "GIL", "VAZQUEZ", "SERRANO", "RAMOS", "BLANCO"]
+NOMBRES = ["LUCIA", "HUGO", "SOFIA", "MARTIN", "MARIA", "PABLO", "JULIA", "DANIEL", "PAULA", "ALEJANDRO",
+           "VALERIA", "ADRIAN", "EMMA", "DAVID", "CARLA", "MARIO", "SARA", "LEO", "ALBA", "ALVARO"]
+
+
+def datos_sinteticos(n_alumnos=30, n_materias=10, semilla=0):
+    """Acta larga Alumno/Materia/Nota con nombres "APELLIDO APELLIDO, NOMBRE" únicos."""
+    rng = np.random.default_rng(semilla)
+    materias = MATERIAS[:n_materias] + [f"OPT{i}" for i in range(n_materias - len(MATERIAS))]
+    alumnos = [f"{APELLIDOS[i % 20]} {APELLIDOS[(i // 20) % 20]}{'' if i < 400 else i // 400}, {NOMBRES[(i * 7) % 20]}"
+               for i in range(n_alumnos)]
+    notas = np.clip(np.round(rng.normal(6, 2, (n_alumnos, len(materias)))), 1, 10)
+    return pd.DataFrame({'Alumno': np.repeat(alumnos, len(materias)), 'Materia': materias * n_alumnos,
+                         'Nota': notas.ravel()})
+
+def _filas_por_alumno(df):
+    piv = df.pivot(index='Alumno', columns='Materia', values='Nota').reindex(df['Alumno'].unique())
+    return list(piv.columns), [(al, [f"{n:g}" for n in fila]) for al, fila in zip(piv.index, piv.to_numpy())]
+
+def acta_xlsx(df):
+    bio = io.BytesIO(); df.to_excel(bio, index=False)
+    return bio.getvalue()
+
+def acta_pdf(df, paginas=1):
+    materias, filas = _filas_por_alumno(df)
+    por_pagina = -(-len(filas) // paginas)
+    bio = io.BytesIO()
+    with PdfPages(bio) as pdf:
+        for p in range(paginas):
+            bloque = filas[p * por_pagina:(p + 1) * por_pagina]
+            if not bloque: break
+            fig = Figure(figsize=(11.7, 8.3)); ax = fig.subplots(); ax.axis('off')
+            ax.set_title(f"ACTA DE EVALUACIÓN - 1º BACH - Página {p + 1}")
+            celdas = [[f"{p * por_pagina + i + 1}. {al}", *notas] for i, (al, notas) in enumerate(bloque)]
+            tabla = ax.table(cellText=celdas, colLabels=["Alumno/a", *materias], loc='upper center',
+                             colWidths=[0.35] + [0.65 / len(materias)] * len(materias))
+            tabla.auto_set_font_size(False); tabla.set_fontsize(6)
+            pdf.savefig(fig)
+    return bio.getvalue()
+
+def acta_docx(df):
+    materias, filas = _filas_por_alumno(df)
+    doc = docx.Document()
+    doc.add_paragraph("ACTA DE EVALUACIÓN - 1º BACH")
+    doc.add_paragraph("Materias: " + " ".join(materias))
+    for i, (al, notas) in enumerate(filas, start=1):
+        doc.add_paragraph(f"{i}. {al}   " + "  ".join(notas))
+    bio = io.BytesIO(); doc.save(bio)
+    return bio.getvalue()
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Escribe actas sintéticas con una carpeta por grupo.")
+    parser.add_argument("salida")
+    parser.add_argument("--grupos", type=int, default=3)
+    parser.add_argument("--alumnos", type=int, default=30)
+    parser.add_argument("--materias", type=int, default=10)
+    parser.add_argument("--paginas", type=int, default=2)
+    parser.add_argument("--formato", choices=["xlsx", "pdf", "docx"], default="pdf")
+    args = parser.parse_args()
+
+    escribir = {"xlsx": acta_xlsx, "pdf": lambda df: acta_pdf(df, args.paginas), "docx": acta_docx}[args.formato]
+    for g in range(args.grupos):
+        carpeta = Path(args.salida) / f"GRUPO_{g + 1}"; carpeta.mkdir(parents=True, exist_ok=True)
+        (carpeta / f"acta.{args.formato}").write_bytes(escribir(datos_sinteticos(args.alumnos, args.materias, semilla=g)))
@@ -0,0 +1,104 @@
+"""Servidor local compatible con la API de chat de OpenAI para pruebas y benchmarks.
+
+"Extrae" las notas de las actas DOCX sintéticas (línea ``Materias:`` y líneas
+"N. APELLIDOS, NOMBRE nota nota ...") y responde en el formato Alumno|Materia|Nota,
+con latencia configurable, respuestas en streaming, ``usage`` y 429 simulados.
+
+    python -m benchmarks.mock_openai --puerto 8765 --latencia 0.5
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RE_MATERIAS = re.compile(r'^\s*Materias:\s*(.+)$', re.M)
+RE_ALUMNO = re.compile(r'^\s*\d+\.\s+(.+?,\s*\S+)\s+((?:\d+(?:[.,]\d+)?\s*)+)$', re.M)
+
+
+def responder(prompt):
+    m = RE_MATERIAS.search(prompt)
+    materias = m.group(1).split() if m else []
+    lineas = []
+    for al, notas in RE_ALUMNO.findall(prompt):
+        for materia, nota in zip(materias, notas.split()):
+            lineas.append(f"{al}|{materia}|{nota}")
+    return "```csv\n" + "\n".join(lineas) + "\n```"
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, estado, cuerpo, cabeceras=()):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        for k, v in cabeceras: self.send_header(k, v)
+        self.end_headers(); self.wfile.write(datos)
+
+    def do_POST(self):
+        srv = self.server
+        peticion = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with srv.lock:
+            srv.peticiones += 1
+            fallar = srv.fallar_cada and srv.peticiones % srv.fallar_cada == 0
+        if fallar:
+            return self._json(429, {"error": {"message": "Rate limit (simulado)", "type": "rate_limit"}},
+                              [("retry-after", "0.1")])
+
+        prompt = "\n".join(m.get("content", "") for m in peticion.get("messages", []))
+        texto = responder(prompt)
+        uso = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(texto) // 4,
+               "total_tokens": len(prompt) // 4 + len(texto) // 4}
+        time.sleep(srv.latencia)
+        base = {"id": "mock", "created": int(time.time()), "model": peticion.get("model", "mock")}
+        if not peticion.get("stream"):
+            return self._json(200, {**base, "object": "chat.completion", "usage": uso, "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": texto}}]})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        def _evento(cuerpo):
+            self.wfile.write(b"data: " + json.dumps(cuerpo).encode() + b"\n\n"); self.wfile.flush()
+        self.close_connection = True
+        try:
+            for linea in texto.splitlines(keepends=True):
+                _evento({**base, "object": "chat.completion.chunk", "choices": [
+                    {"index": 0, "delta": {"content": linea}, "finish_reason": None}]})
+                time.sleep(srv.latencia_linea)
+            _evento({**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if (peticion.get("stream_options") or {}).get("include_usage"):
+                _evento({**base, "object": "chat.completion.chunk", "choices": [], "usage": uso})
+            self.wfile.write(b"data: [DONE]\n\n"); self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # el cliente ha cancelado la respuesta
+
+def iniciar(puerto=0, latencia=0.0, latencia_linea=0.0, fallar_cada=0):
+    """Arranca el servidor en un hilo y lo devuelve; la URL base es ``url(servidor)``."""
+    srv = ThreadingHTTPServer(("127.0.0.1", puerto), _Manejador)
+    srv.daemon_threads = True
+    srv.latencia, srv.latencia_linea, srv.fallar_cada = latencia, latencia_linea, fallar_cada
+    srv.peticiones, srv.lock = 0, threading.Lock()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+def url(srv):
+    return f"http://127.0.0.1:{srv.server_port}/v1"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.5, help="segundos antes de responder")
+    parser.add_argument("--latencia-linea", type=float, default=0.0, help="segundos entre líneas en streaming")
+    parser.add_argument("--fallar-cada", type=int, default=0, help="devolver 429 cada N peticiones")
+    args = parser.parse_args()
+    srv = iniciar(args.puerto, args.latencia, args.latencia_linea, args.fallar_cada)
+    print(f"Mock OpenAI en {url(srv)} (Ctrl+C para salir)")
+    try: threading.Event().wait()
+    except KeyboardInterrupt: srv.shutdown()
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+DIRECTORIO = Path(os.environ.get("ACTAS_CACHE_DIR", Path.home() / ".cache" / "analizador-notas"))
+TAMANO_MAXIMO = int(os.environ.get("ACTAS_CACHE_MB", "200")) * 1024 * 1024
+
+_lock = threading.Lock()
+
+
+# --- CLAVES ---
+def huella(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+def clave(*partes):
+    return hashlib.sha256("|".join(str(p) for p in partes).encode()).hexdigest()
+
+def _ruta(k, ext):
+    return DIRECTORIO / k[:2] / f"{k}.{ext}"
+
+# --- LECTURA / ESCRITURA ---
+def _tocar(ruta):
+    # La fecha de modificación hace de marca LRU
+    try: os.utime(ruta)
+    except OSError: pass
+
+def leer_texto(k):
+    ruta = _ruta(k, "txt")
+    try: txt = ruta.read_text(encoding="utf-8")
+    except OSError: return None
+    _tocar(ruta)
+    return txt
+
+def guardar_texto(k, txt):
+    _escribir(_ruta(k, "txt"), txt.encode("utf-8"))
+
+def leer_df(k):
+    ruta = _ruta(k, "parquet")
+    if not ruta.exists(): return None
+    try: df = pd.read_parquet(ruta)
+    except Exception: return None
+    _tocar(ruta)
+    return df
+
+def guardar_df(k, df):
+    df = df[['Alumno', 'Materia', 'Nota']].astype({'Alumno': str, 'Materia': str})
+    df['Nota'] = pd.to_numeric(df['Nota'], errors='coerce')
+    _escribir(_ruta(k, "parquet"), df.to_parquet(index=False, compression="zstd"))
+
+def _escribir(ruta, datos):
+    try:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(datos)
+        os.replace(tmp, ruta)
+    except OSError:
+        return
+    desalojar()
+
+# --- GESTIÓN ---
+def _entradas():
+    if not DIRECTORIO.exists(): return []
+    return [p for p in DIRECTORIO.glob("*/*") if p.suffix in (".txt", ".parquet")]
+
+def tamano():
+    total = 0
+    for p in _entradas():
+        try: total += p.stat().st_size
+        except OSError: pass
+    return total
+
+def desalojar(maximo=None):
+    """Elimina las entradas menos usadas hasta que la caché quepa en ``maximo`` bytes."""
+    maximo = TAMANO_MAXIMO if maximo is None else maximo
+    with _lock:
+        entradas = []
+        for p in _entradas():
+            try: info = p.stat()
+            except OSError: continue
+            entradas.append((info.st_mtime, info.st_size, p))
+        total = sum(e[1] for e in entradas)
+        for _, size, p in sorted(entradas, key=lambda e: e[0]):
+            if total <= maximo: break
+            try: p.unlink(); total -= size
+            except OSError: pass
+
+def vaciar():
+    desalojar(0)
@@ -0,0 +1,221 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from matriz_notas import NOTA_APROBADO, MatrizNotas, codificar
+from nombres import unificar_alumnos
+
+MAX_ENTRADAS_CACHE = 8
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Estadisticas:
+    """Resultado de la limpieza y los cálculos de un acta. No debe modificarse: se comparte desde la caché."""
+    df: pd.DataFrame
+    orden_alumnos: np.ndarray
+    stats_al: pd.DataFrame
+    stats_mat: pd.DataFrame
+    res: dict
+    matriz: MatrizNotas
+
+
+# --- TEXTOS ---
+def generar_valoracion_detallada(res):
+    txt = f"Nota media global: {res['media_grupo']:.2f}. "
+    if res['pct_pasan'] >= 85: txt += "Promoción excelente."
+    elif res['pct_pasan'] >= 70: txt += "Promoción satisfactoria."
+    else: txt += "Promoción baja, requiere intervención."
+    return txt
+
+# --- LIMPIEZA ---
+def limpiar_datos(df):
+    df = df.iloc[:, :3].copy()
+    df.columns = ['Alumno', 'Materia', 'Nota']
+
+    # LIMPIEZA Y FILTROS ESTADÍSTICOS EXACTOS
+    df['Nota'] = pd.to_numeric(df['Nota'], errors='coerce')
+    df = df.dropna(subset=['Alumno', 'Nota'])
+    df = df[~df['Alumno'].astype(str).str.contains('Alumno|Nombre|Apellidos', case=False, na=False)]
+    # Único punto de limpieza de nombres: también une "PEREZ, JUAN" y "Juan Pérez" de actas distintas
+    df = unificar_alumnos(df)
+    df = df.drop_duplicates(subset=['Alumno', 'Materia'], keep='last')
+    df['Aprobado'] = df['Nota'] >= NOTA_APROBADO
+    return df
+
+# --- CÁLCULOS ---
+def _resumen(conteos, media_grupo, media_suspensos):
+    cero, uno, dos, tres, mas_tres = (int(c) for c in conteos)
+    total = cero+uno+dos+tres+mas_tres
+    pasan = cero+uno+dos; no_pasan = tres+mas_tres
+    base = total if total>0 else 1
+
+    res = {'total_alumnos': total, 'media_grupo': media_grupo, 'media_suspensos_grupo': media_suspensos,
+           'cero':cero, 'pct_cero':(cero/base)*100, 'uno':uno, 'pct_uno':(uno/base)*100,
+           'dos':dos, 'pct_dos':(dos/base)*100, 'tres':tres, 'pct_tres':(tres/base)*100,
+           'mas_tres':mas_tres, 'pct_mas_tres':(mas_tres/base)*100,
+           'pasan': pasan, 'pct_pasan': (pasan/base)*100, 'no_pasan': no_pasan, 'pct_no_pasan': (no_pasan/base)*100}
+    res['valoracion'] = generar_valoracion_detallada(res)
+    return res
+
+def _cubos(suspensos):
+    # Cubos 0, 1, 2, 3 y >3 en una sola pasada
+    return np.bincount(np.minimum(np.asarray(suspensos, dtype=np.int64), 4), minlength=5)
+
+def resumen_promocion(suspensos_por_alumno, media_grupo):
+    """Construye el diccionario ``res`` a partir del nº de suspensos de cada alumno."""
+    suspensos = np.asarray(suspensos_por_alumno, dtype=np.int64)
+    return _resumen(_cubos(suspensos), media_grupo, suspensos.mean() if len(suspensos) else float('nan'))
+
+def _agregados(codigos, n, notas):
+    """Nº de notas, suma y nº de suspensos por código, con np.bincount en float64."""
+    cuenta = np.bincount(codigos, minlength=n)
+    suma = np.bincount(codigos, weights=notas, minlength=n)
+    suspensos = np.bincount(codigos, weights=notas < NOTA_APROBADO, minlength=n).astype(np.int64)
+    return cuenta, suma, suspensos
+
+def _stats_mat(materias, cuenta, suma, suspensos):
+    stats_mat = pd.DataFrame({'Materia': materias, 'Total': cuenta, 'Aprobados': cuenta - suspensos,
+                              'Suspensos': suspensos, 'Media': suma / cuenta})
+    stats_mat['Pct_Aprobados'] = (stats_mat['Aprobados']/stats_mat['Total'])*100
+    stats_mat['Pct_Suspensos'] = (stats_mat['Suspensos']/stats_mat['Total'])*100
+
+    # --- ORDENACIÓN DE MATERIAS MEJORADA (100% ARRIBA) ---
+    return stats_mat.sort_values(by=['Pct_Aprobados', 'Materia'], ascending=[False, True])
+
+def _calcular(df):
+    df = limpiar_datos(df)
+    notas = df['Nota'].to_numpy(dtype=np.float64)
+    cod_al, alumnos, cod_mat, materias = codificar(df)
+    matriz = MatrizNotas.desde_codigos(cod_al, alumnos, cod_mat, materias, notas)
+
+    # ORDEN ORIGINAL
+    orden_alumnos = alumnos.to_numpy(dtype=object)
+
+    # Agregados por código sobre las notas en float64 (la matriz float32 es solo para vistas)
+    cuenta, suma, suspensos = _agregados(cod_al, len(alumnos), notas)
+    stats_al = (pd.DataFrame({'Alumno': alumnos, 'Suspensos': suspensos, 'Media': suma / cuenta})
+                .sort_values('Alumno').reset_index(drop=True))
+    stats_mat = _stats_mat(materias, *_agregados(cod_mat, len(materias), notas))
+
+    res = resumen_promocion(suspensos, df['Nota'].mean())
+    return Estadisticas(df, orden_alumnos, stats_al, stats_mat, res, matriz)
+
+# --- RECÁLCULO INCREMENTAL ---
+def detectar_cambios(matriz, editada):
+    """Compara la matriz con la tabla del editor: ``[(alumno, materia, nota_nueva)]``."""
+    despues = (editada.reindex(index=matriz.alumnos, columns=matriz.materias)
+               .apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64))
+    # La comparación se hace en float32, la precisión con la que se mostró la matriz
+    antes, despues32 = matriz.notas, despues.astype(np.float32)
+    distinto = ~((antes == despues32) | (np.isnan(antes) & np.isnan(despues32)))
+    filas, cols = np.nonzero(distinto)
+    # El editor guarda lo escrito en la columna float32: 6.7 llega como 6.699999809...;
+    # se recupera el decimal más corto que representa ese float32
+    return [(matriz.alumnos[i], matriz.materias[j], float(np.format_float_positional(despues32[i, j], unique=True)))
+            for i, j in zip(filas, cols)]
+
+def aplicar_cambios(est, cambios):
+    """Aplica notas corregidas sin repetir la limpieza ni las agregaciones completas.
+
+    Solo se recalculan las filas de ``stats_al`` de los alumnos tocados y las de
+    ``stats_mat`` de las materias tocadas; los cubos de promoción y las medias del
+    grupo se ajustan con la diferencia. Devuelve unas ``Estadisticas`` nuevas.
+    """
+    if not cambios: return est
+    matriz = est.matriz.copia()
+    alumnos = list(dict.fromkeys(al for al, _, _ in cambios))
+    materias = list(dict.fromkeys(m for _, m, _ in cambios))
+    anteriores = est.stats_al.set_index('Alumno').reindex(alumnos)
+
+    # DataFrame largo: modificar, borrar (NaN) o añadir las celdas cambiadas
+    df = est.df
+    # Posición de cada celda cambiada, buscando solo entre las filas de los alumnos tocados
+    tocadas = np.flatnonzero(df['Alumno'].isin(alumnos).to_numpy())
+    posiciones = dict(zip(zip(df['Alumno'].to_numpy()[tocadas], df['Materia'].to_numpy()[tocadas]), tocadas))
+    pos = np.array([posiciones.get((al, m), -1) for al, m, _ in cambios], dtype=np.int64)
+    notas = np.array([n for _, _, n in cambios], dtype=float)
+    df = df.copy()
+    actualizar = (pos >= 0) & ~np.isnan(notas)
+    df.iloc[pos[actualizar], df.columns.get_loc('Nota')] = notas[actualizar]
+    nuevas = [(al, m, n) for (al, m, n), p in zip(cambios, pos) if p < 0 and not np.isnan(n)]
+    borrar = pos[(pos >= 0) & np.isnan(notas)]
+    antes = est.df['Nota'].to_numpy()
+    suma = est.res['media_grupo'] * len(est.df)
+    suma += notas[actualizar].sum() - antes[pos[actualizar]].sum()
+    suma -= antes[borrar].sum()
+    suma += sum(n for _, _, n in nuevas)
+    if len(borrar): df = df.drop(index=df.index[borrar])
+    if nuevas: df = pd.concat([df, pd.DataFrame(nuevas, columns=['Alumno', 'Materia', 'Nota'])], ignore_index=True)
+    df['Aprobado'] = df['Nota'] >= NOTA_APROBADO
+    for al, m, n in cambios: matriz.fijar(al, m, n)
+
+    # Alumnos tocados: agregados sobre sus filas del acta larga (en float64)
+    sub = df[df['Alumno'].isin(alumnos)]
+    cod = pd.Index(alumnos).get_indexer(sub['Alumno'])
+    cuenta, suma_al, susp = _agregados(cod, len(alumnos), sub['Nota'].to_numpy(dtype=np.float64))
+    stats_al = est.stats_al.set_index('Alumno')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats_al.loc[alumnos, 'Media'] = suma_al / cuenta
+    stats_al.loc[alumnos, 'Suspensos'] = susp
+    vacios = pd.Index(alumnos)[cuenta == 0]
+    stats_al = stats_al.drop(index=vacios).reset_index()
+    stats_al['Suspensos'] = stats_al['Suspensos'].astype(est.stats_al['Suspensos'].dtype)
+    orden_alumnos = est.orden_alumnos[~np.isin(est.orden_alumnos, vacios)] if len(vacios) else est.orden_alumnos
+
+    # Materias tocadas
+    sub = df[df['Materia'].isin(materias)]
+    cod = pd.Index(materias).get_indexer(sub['Materia'])
+    cuenta_m, suma_m, susp_m = _agregados(cod, len(materias), sub['Nota'].to_numpy(dtype=np.float64))
+    con_notas = cuenta_m > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        nuevas_mat = _stats_mat(pd.Index(materias)[con_notas], cuenta_m[con_notas], suma_m[con_notas], susp_m[con_notas])
+    stats_mat = est.stats_mat[~est.stats_mat['Materia'].isin(materias)]
+    stats_mat = pd.concat([stats_mat, nuevas_mat.astype(stats_mat.dtypes.to_dict())], ignore_index=True)
+    stats_mat = stats_mat.sort_values(by=['Pct_Aprobados', 'Materia'], ascending=[False, True])
+    matriz = matriz.quitar(vacios, pd.Index(materias)[~con_notas])
+
+    # Cubos de promoción: quitar los de antes y sumar los de ahora
+    susp_antes = anteriores['Suspensos'].to_numpy()
+    susp_ahora = susp[cuenta > 0]
+    conteos = np.array([est.res[k] for k in ('cero', 'uno', 'dos', 'tres', 'mas_tres')]) - _cubos(susp_antes) + _cubos(susp_ahora)
+    total_al = int(conteos.sum())
+    suma_susp = est.res['media_suspensos_grupo'] * est.res['total_alumnos'] - susp_antes.sum() + susp_ahora.sum()
+    res = _resumen(conteos, suma / len(df) if len(df) else float('nan'),
+                   suma_susp / total_al if total_al else float('nan'))
+    return Estadisticas(df, orden_alumnos, stats_al, stats_mat, res, matriz)
+
+# --- CACHÉ ---
+def huella_datos(df):
+    h = hashlib.sha256("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def registrar(df, est):
+    """Guarda ``est`` como resultado de ``calcular(df)`` (tras un recálculo incremental)."""
+    with _lock:
+        _cache[huella_datos(df)] = est
+        while len(_cache) > MAX_ENTRADAS_CACHE: _cache.popitem(last=False)
+
+def calcular(df):
+    """Limpia el acta y calcula estadísticas de alumnos, materias y promoción.
+
+    El resultado se memoriza por el hash del contenido de ``df``: los reruns de
+    Streamlit que no cambian los datos no recalculan nada.
+    """
+    clave = huella_datos(df)
+    with _lock:
+        if clave in _cache:
+            _cache.move_to_end(clave)
+            return _cache[clave]
+    est = _calcular(df)
+    with _lock:
+        _cache[clave] = est
+        while len(_cache) > MAX_ENTRADAS_CACHE: _cache.popitem(last=False)
+    return est
@@ -0,0 +1,508 @@
+import io
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+import docx
+import openai
+import pandas as pd
+import pdfplumber
+
+import cache_actas
+import instrumentacion
+import procesos
+
+MODELO = "gpt-4o"
+# Subir estas versiones invalida las entradas de caché generadas con el prompt/extractor anterior
+VERSION_PROMPT = 3
+VERSION_TEXTO = 2
+MAX_CONCURRENCIA = 4
+MAX_REINTENTOS = 5
+ESPERA_BASE = 1.0
+ESPERA_MAXIMA = 30.0
+TAMANO_FRAGMENTO = 8000
+SEPARADOR_PAGINA = "\f"
+UMBRAL_CONFIANZA = 0.9
+# Por debajo de estas páginas no compensa arrancar procesos; cada tarea abarca PAGINAS_POR_TAREA
+PAGINAS_MIN_PARALELO = 8
+PAGINAS_POR_TAREA = 4
+# Línea de alumno: "1. APELLIDOS, NOMBRE", "12 - APELLIDOS..." (el índice va seguido de letra, no de otra nota)
+RE_LINEA_ALUMNO = re.compile(r'^\s*\d{1,3}\s*[\.\-\)]\s*[^\W\d_]')
+RE_COLUMNA_ORDEN = re.compile(r'^\s*(n\.?\s*[º°o]\.?|n[uú]m(ero)?\.?|orden|#)\s*$', re.IGNORECASE)
+
+
+# --- FUNCIONES DE EXTRACCIÓN ---
+def _leer_bytes(f):
+    if hasattr(f, 'getvalue'): return f.getvalue()
+    f.seek(0)
+    return f.read()
+
+def _leer_pagina(page, solo_texto):
+    filas, confianza = ([], 0.0) if solo_texto else parsear_tabla_pagina(page)
+    if confianza >= UMBRAL_CONFIANZA: texto = ""
+    else: filas, texto = [], (page.extract_text(x_tolerance=2, y_tolerance=2) or "") + "\n" + SEPARADOR_PAGINA
+    # Liberar los objetos de layout de la página antes de pasar a la siguiente
+    page.close()
+    return filas, texto
+
+def _leer_paginas(contenido, indices, solo_texto):
+    """Trabajo de un proceso: devuelve ``[(índice, filas, texto)]`` de las páginas pedidas."""
+    with pdfplumber.open(io.BytesIO(contenido)) as pdf:
+        return [(i, *_leer_pagina(pdf.pages[i], solo_texto)) for i in indices]
+
+def _recorrer_paginas(contenido, solo_texto=False, on_pagina=None, paralelo=True):
+    """Procesa las páginas de un PDF (en paralelo si es largo) y las devuelve en orden.
+
+    ``on_pagina(hechas, total)`` se llama a medida que terminan las páginas (o los
+    lotes de páginas, en paralelo).
+    """
+    with pdfplumber.open(io.BytesIO(contenido)) as pdf:
+        n = len(pdf.pages)
+        paginas = [None] * n
+        hechas = 0
+        def _guardar(lote):
+            nonlocal hechas
+            for i, filas, texto in lote: paginas[i] = (filas, texto)
+            hechas += len(lote)
+            if on_pagina: on_pagina(hechas, n)
+
+        if paralelo and n >= PAGINAS_MIN_PARALELO and procesos.NUCLEOS >= 2:
+            lotes = [list(range(i, min(i + PAGINAS_POR_TAREA, n))) for i in range(0, n, PAGINAS_POR_TAREA)]
+            # Si el pool se rompe dos veces, las páginas que falten se leen abajo con el PDF ya abierto
+            for lote in procesos.mapear(partial(_leer_paginas, contenido, solo_texto=solo_texto), lotes,
+                                        en_proceso=lambda resto: ()):
+                _guardar(lote)
+        # En este proceso, con el PDF ya abierto: reabrirlo por página repetiría el análisis del documento
+        for i in range(n):
+            if paginas[i] is None: _guardar([(i, *_leer_pagina(pdf.pages[i], solo_texto))])
+    return paginas
+
+def get_pdf_text_content(file, on_pagina=None, paralelo=True):
+    try:
+        contenido = file if isinstance(file, bytes) else _leer_bytes(file)
+        return "".join(texto for _, texto in _recorrer_paginas(contenido, True, on_pagina, paralelo))
+    except Exception as e:
+        return ""
+
+def extract_text_from_docx(file):
+    try:
+        doc = docx.Document(file)
+        return "\n".join([para.text for para in doc.paragraphs])
+    except: return ""
+
+# --- LECTURA LOCAL DE TABLAS ---
+def _como_nota(celda):
+    if celda is None: return None
+    try: nota = float(str(celda).strip().replace(',', '.'))
+    except ValueError: return None
+    return nota if 0 <= nota <= 10 else None
+
+def _es_nombre(celda):
+    return isinstance(celda, str) and sum(c.isalpha() for c in celda) >= 4 and _como_nota(celda) is None
+
+def _leer_tabla(filas):
+    """Convierte una tabla alumnos × materias en filas Alumno/Materia/Nota y su confianza (0-1)."""
+    filas = [[(c or "").replace("\n", " ").strip() for c in f] for f in filas if f]
+    if len(filas) < 2: return [], 0.0
+    ancho = max(len(f) for f in filas)
+    filas = [f + [""] * (ancho - len(f)) for f in filas]
+
+    # Columna de nombres: la que más celdas con nombre tiene; columnas de notas: mayoría numérica
+    col_nombre = max(range(ancho), key=lambda j: sum(_es_nombre(f[j]) for f in filas))
+    datos = [i for i, f in enumerate(filas)
+             if _es_nombre(f[col_nombre]) and any(_como_nota(c) is not None for c in f)]
+    if not datos: return [], 0.0
+    cols_nota = [j for j in range(ancho) if j != col_nombre
+                 and sum(_como_nota(filas[i][j]) is not None for i in datos) > len(datos) / 2]
+    if not cols_nota: return [], 0.0
+
+    # Cabecera: la celda no vacía más cercana por encima de la primera fila de datos
+    materias = {}
+    for j in cols_nota:
+        materias[j] = next((filas[i][j] for i in range(datos[0] - 1, -1, -1) if filas[i][j]), "")
+    # Fuera la columna de número de orden: cabecera "Nº"/"Orden", o sin cabecera y con enteros
+    # consecutivos fila a fila. Una materia con cabecera nunca se descarta, aunque sus notas suban de uno en uno
+    for j in list(materias):
+        if RE_COLUMNA_ORDEN.match(materias[j]): del materias[j]; continue
+        if materias[j]: continue
+        valores = [filas[i][j].rstrip('.') for i in datos]
+        if len(datos) >= 3 and all(v.isdigit() for v in valores) \
+                and all(int(b) - int(a) == 1 for a, b in zip(valores, valores[1:])): del materias[j]
+    cols_nota = list(materias)
+    if not cols_nota or not all(materias.values()): return [], 0.0
+
+    resultado, validas, rellenas = [], 0, 0
+    for i in datos:
+        for j in cols_nota:
+            celda = filas[i][j]
+            if not celda: continue
+            rellenas += 1
+            nota = _como_nota(celda)
+            if nota is None: continue
+            validas += 1
+            resultado.append((filas[i][col_nombre], materias[j], nota))
+    return resultado, (validas / rellenas if rellenas else 0.0)
+
+def parsear_tabla_pagina(page):
+    """Lee las tablas de una página de pdfplumber. Devuelve ``(filas, confianza)``."""
+    tablas = page.extract_tables()
+    if not tablas:
+        # Actas sin líneas de tabla: usar la posición de las palabras
+        tablas = page.extract_tables({"vertical_strategy": "text", "horizontal_strategy": "text"})
+    filas_total, confianzas = [], []
+    for tabla in tablas:
+        filas, confianza = _leer_tabla(tabla)
+        if filas:
+            filas_total += filas; confianzas.append((confianza, len(filas)))
+    if not filas_total: return [], 0.0
+    # Confianza media ponderada por número de notas leídas en cada tabla
+    return filas_total, sum(c * n for c, n in confianzas) / len(filas_total)
+
+def analizar_pdf(file, on_pagina=None, paralelo=True):
+    """Lee localmente las páginas con tabla reconocible y devuelve el texto del resto.
+
+    Devuelve ``(df_local, texto_pendiente)``. Solo las páginas cuya confianza no
+    alcanza ``UMBRAL_CONFIANZA`` se incluyen en ``texto_pendiente`` para el modelo.
+    """
+    contenido = file if isinstance(file, bytes) else _leer_bytes(file)
+    paginas = _recorrer_paginas(contenido, False, on_pagina, paralelo)
+    df = pd.DataFrame([fila for filas, _ in paginas for fila in filas], columns=['Alumno', 'Materia', 'Nota'])
+    return df, "".join(texto for _, texto in paginas)
+
+# --- CONTROL DE TASA ---
+class ExtraccionCancelada(Exception):
+    """El usuario ha cancelado la extracción en curso."""
+
+class LimitadorTasa:
+    """Limita las llamadas simultáneas al modelo y coordina las esperas tras un 429/5xx.
+
+    Cuando una llamada recibe un 429, todas las demás esperan al mismo instante de
+    reanudación en lugar de seguir golpeando la API cada una por su cuenta.
+    """
+
+    def __init__(self, max_concurrentes=MAX_CONCURRENCIA):
+        self._semaforo = threading.BoundedSemaphore(max_concurrentes)
+        self._lock = threading.Lock()
+        self._reanudar_en = 0.0
+
+    def pausar(self, segundos):
+        with self._lock:
+            self._reanudar_en = max(self._reanudar_en, time.monotonic() + segundos)
+
+    def __enter__(self):
+        self._semaforo.acquire()
+        while True:
+            with self._lock:
+                espera = self._reanudar_en - time.monotonic()
+            if espera <= 0: return self
+            time.sleep(espera)
+
+    def __exit__(self, *exc):
+        self._semaforo.release()
+        return False
+
+def _espera_reintento(error, intento):
+    # Respetar Retry-After si el servidor lo envía; si no, backoff exponencial con jitter
+    respuesta = getattr(error, 'response', None)
+    if respuesta is not None:
+        try: return min(float(respuesta.headers.get('retry-after')), ESPERA_MAXIMA)
+        except (TypeError, ValueError): pass
+    return min(ESPERA_BASE * 2 ** intento, ESPERA_MAXIMA) * random.uniform(0.5, 1.0)
+
+def _es_reintentable(error):
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)): return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def _llamar_modelo(client, prompt, limitador, cancelar=None):
+    """Itera los ``chunk`` de la respuesta en streaming (el último trae el ``usage``).
+
+    Solo se reintenta mientras no haya llegado ningún token: a partir de ahí las
+    filas ya se han entregado y repetir la llamada las duplicaría.
+    """
+    for intento in range(MAX_REINTENTOS + 1):
+        recibido = False
+        try:
+            with limitador:
+                stream = client.chat.completions.create(
+                    model=MODELO,
+                    messages=[{"role": "user", "content": prompt}], temperature=0,
+                    stream=True, stream_options={"include_usage": True}
+                )
+                with stream:
+                    for chunk in stream:
+                        if cancelar is not None and cancelar.is_set(): raise ExtraccionCancelada()
+                        recibido = recibido or bool(chunk.choices and chunk.choices[0].delta.content)
+                        yield chunk
+            return
+        except ExtraccionCancelada: raise
+        except Exception as e:
+            if recibido or intento == MAX_REINTENTOS or not _es_reintentable(e): raise
+            limitador.pausar(_espera_reintento(e, intento))
+
+def crear_cliente(api_key, base_url=None):
+    # Los reintentos los gestiona _llamar_modelo para coordinarlos entre hilos
+    return openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+# --- FRAGMENTACIÓN ---
+def _bloques_pagina(pagina):
+    """Separa una página en (cabecera, [bloques de alumno])."""
+    cabecera, bloques = [], []
+    for linea in pagina.splitlines():
+        if RE_LINEA_ALUMNO.match(linea): bloques.append([linea])
+        elif bloques: bloques[-1].append(linea)
+        else: cabecera.append(linea)
+    return "\n".join(cabecera).strip(), ["\n".join(b) for b in bloques]
+
+def dividir_en_fragmentos(texto, max_chars=TAMANO_FRAGMENTO):
+    """Divide el texto del acta en fragmentos de ~``max_chars`` sin partir ningún alumno.
+
+    Los cortes se hacen en los límites de página o de alumno, y cada fragmento lleva
+    delante la cabecera del acta (materias, grupo...) y la de su página para que el
+    modelo conserve el contexto de las columnas.
+    """
+    if len(texto) <= max_chars: return [texto]
+    paginas = [_bloques_pagina(p) for p in texto.split(SEPARADOR_PAGINA) if p.strip()]
+    cabecera_acta = next((cab for cab, _ in paginas if cab), "")
+
+    fragmentos = []
+    for cab_pagina, bloques in paginas:
+        if not bloques:
+            bloques, cab_pagina = [cab_pagina], ""
+        contexto = "\n".join(c for c in dict.fromkeys([cabecera_acta, cab_pagina]) if c)
+        actual = []
+        for bloque in bloques:
+            if actual and len(contexto) + sum(len(b) + 1 for b in actual) + len(bloque) > max_chars:
+                fragmentos.append("\n".join([contexto, *actual]).strip())
+                actual = []
+            actual.append(bloque)
+        if actual: fragmentos.append("\n".join([contexto, *actual]).strip())
+
+    # Unir páginas pequeñas consecutivas para no multiplicar llamadas
+    unidos = []
+    for frag in fragmentos:
+        if unidos and len(unidos[-1]) + len(frag) + 1 <= max_chars: unidos[-1] += "\n" + frag
+        else: unidos.append(frag)
+    return unidos
+
+# --- PROCESAMIENTO IA ---
+def _prompt(texto, filename, parte, total):
+    contexto = f" (fragmento {parte} de {total}; las primeras líneas son la cabecera del acta)" if total > 1 else ""
+    return f"""
+    Analiza el texto de este acta ('{filename}'){contexto}.
+    ESTRUCTURA:
+    1. Lista de alumnos (ej: "1. APELLIDOS, NOMBRE"). El número es índice, NO NOTA.
+    2. Las notas (0-10) están separadas.
+    3. Asocia cada alumno con sus notas en orden.
+
+    TAREA:
+    Genera datos separados por '|'. NO USES COMAS.
+    Formato: Alumno|Materia|Nota (una fila por línea, sin cabecera ni texto adicional)
+
+    REGLAS:
+    - Alumno: Nombre COMPLETO (ej: "PEREZ, JUAN").
+    - Materia: Abreviatura.
+    - Nota: Número decimal.
+
+    Texto:
+    {texto}
+    """
+
+def parsear_linea(linea):
+    """Convierte una línea ``Alumno|Materia|Nota`` en una tupla con la nota como float.
+
+    Devuelve ``None`` en las líneas que no son datos (vacías, vallas de markdown o
+    la cabecera) y lanza ``ValueError`` si la línea está mal formada.
+    """
+    linea = linea.strip()
+    if not linea or linea.startswith("```"): return None
+    campos = [c.strip() for c in linea.split('|')]
+    if len(campos) != 3: raise ValueError(f"se esperaban 3 campos y hay {len(campos)}")
+    alumno, materia, nota = campos
+    if nota.lower() == 'nota': return None
+    if not alumno or not materia: raise ValueError("alumno o materia vacíos")
+    valor = _como_nota(nota)
+    if valor is None: raise ValueError(f"nota no válida: {nota!r}")
+    return alumno, materia, valor
+
+def _procesar_fragmento(texto, filename, parte, total, client, limitador, registro=instrumentacion.NULO,
+                        on_fila=None, on_aviso=None, cancelar=None):
+    """Lee la respuesta en streaming y valida cada línea en cuanto se completa."""
+    filas, pendiente, uso, primer_token = [], "", None, None
+    def _linea(linea):
+        try: fila = parsear_linea(linea)
+        except ValueError as e:
+            if on_aviso: on_aviso(f"parte {parte}/{total}: línea descartada ({e}): {linea.strip()[:80]}")
+            return
+        if fila is None: return
+        filas.append(fila)
+        if on_fila: on_fila(fila)
+
+    t = time.perf_counter()
+    for chunk in _llamar_modelo(client, _prompt(texto, filename, parte, total), limitador, cancelar):
+        if chunk.usage: uso = chunk.usage
+        if not chunk.choices or not chunk.choices[0].delta.content: continue
+        if primer_token is None: primer_token = time.perf_counter() - t
+        *lineas, pendiente = (pendiente + chunk.choices[0].delta.content).split("\n")
+        for linea in lineas: _linea(linea)
+    _linea(pendiente)
+    registro.llamada(MODELO, filename, uso, time.perf_counter() - t, primer_token)
+    return pd.DataFrame(filas, columns=['Alumno', 'Materia', 'Nota'])
+
+def process_data_with_ai(text_data, api_key, filename, client=None, limitador=None, registro=None,
+                         on_fila=None, on_aviso=None, cancelar=None):
+    """Extrae con el modelo las notas del texto de un acta, leyendo la respuesta en streaming.
+
+    ``on_fila(fila)`` recibe cada fila válida según llega y ``on_aviso(mensaje)`` cada
+    línea descartada; ambos se llaman desde los hilos de trabajo. Si se activa el
+    evento ``cancelar`` se corta la respuesta y se lanza ``ExtraccionCancelada``.
+    ``registro`` (un ``instrumentacion.Registro``) recibe los tokens y la duración de cada llamada.
+    """
+    if not text_data or len(text_data) < 10: return None
+    client = client or crear_cliente(api_key)
+    limitador = limitador or LimitadorTasa(MAX_CONCURRENCIA)
+    registro = registro or instrumentacion.NULO
+
+    fragmentos = dividir_en_fragmentos(text_data)
+    total = len(fragmentos)
+    def _fragmento(parte, texto):
+        return _procesar_fragmento(texto, filename, parte, total, client, limitador, registro, on_fila, on_aviso, cancelar)
+    if total == 1:
+        partes = [_fragmento(1, fragmentos[0])]
+    else:
+        # El limitador compartido acota las llamadas reales aunque haya varios archivos en curso
+        with ThreadPoolExecutor(max_workers=min(total, MAX_CONCURRENCIA)) as pool:
+            partes = list(pool.map(lambda a: _fragmento(*a), enumerate(fragmentos, start=1)))
+
+    df = pd.concat(partes, ignore_index=True)
+    # Los nombres se limpian y unifican una sola vez, en estadisticas.limpiar_datos
+    # Un alumno en el borde de dos fragmentos puede salir dos veces
+    return df.drop_duplicates(subset=['Alumno', 'Materia'], keep='first').reset_index(drop=True)
+
+# --- PROCESAMIENTO CONCURRENTE ---
+def extraer_archivo(nombre, contenido, api_key, client=None, limitador=None, usar_cache=True, on_pagina=None, paralelo=True,
+                    registro=None, on_fila=None, on_aviso=None, cancelar=None):
+    """Extrae el DataFrame Alumno/Materia/Nota de un acta a partir de sus bytes.
+
+    En los PDF se leen primero las tablas con pdfplumber y solo las páginas dudosas
+    van al modelo. Con ``usar_cache`` los PDF/DOCX ya vistos (mismo SHA-256, modelo
+    y versión de prompt) se sirven desde disco sin pasar por pdfplumber ni por la API.
+    Cada etapa (caché, lectura, modelo) se anota en ``registro`` si se pasa.
+    ``on_fila``, ``on_aviso`` y ``cancelar`` se pasan a ``process_data_with_ai``; si
+    hay avisos (líneas descartadas) el resultado no se guarda en la caché.
+    """
+    if cancelar is not None and cancelar.is_set(): raise ExtraccionCancelada()
+    registro = registro or instrumentacion.NULO
+    if nombre.endswith('.xlsx'):
+        with registro.etapa("lectura_xlsx", nombre): return pd.read_excel(io.BytesIO(contenido))
+    es_pdf = nombre.endswith('.pdf')
+    if not (es_pdf or 'doc' in nombre):
+        return None
+
+    sha = cache_actas.huella(contenido)
+    clave_datos = cache_actas.clave(sha, MODELO, VERSION_PROMPT, VERSION_TEXTO, UMBRAL_CONFIANZA)
+    clave_texto = cache_actas.clave(sha, "texto", VERSION_TEXTO, UMBRAL_CONFIANZA)
+    clave_tablas = cache_actas.clave(sha, "tablas", VERSION_TEXTO, UMBRAL_CONFIANZA)
+    txt = local = None
+    if usar_cache:
+        with registro.etapa("cache", nombre):
+            df = cache_actas.leer_df(clave_datos)
+            if df is None:
+                txt = cache_actas.leer_texto(clave_texto)
+                local = cache_actas.leer_df(clave_tablas) if es_pdf else None
+        if df is not None: return df
+
+    if txt is None or (es_pdf and local is None):
+        with registro.etapa("lectura_pdf" if es_pdf else "lectura_docx", nombre):
+            if es_pdf: local, txt = analizar_pdf(contenido, on_pagina, paralelo)
+            else: txt = extract_text_from_docx(io.BytesIO(contenido))
+        if usar_cache:
+            cache_actas.guardar_texto(clave_texto, txt)
+            if local is not None: cache_actas.guardar_df(clave_tablas, local)
+
+    partes = [local] if local is not None and not local.empty else []
+    avisos = []
+    def _aviso(mensaje):
+        avisos.append(mensaje)
+        if on_aviso: on_aviso(mensaje)
+    if txt and len(txt.strip()) >= 10:
+        if client is None and not api_key:
+            raise ValueError("Hay páginas sin tabla reconocible y falta la API Key")
+        with registro.etapa("modelo", nombre):
+            df_ia = process_data_with_ai(txt, api_key, nombre, client=client, limitador=limitador, registro=registro,
+                                         on_fila=on_fila, on_aviso=_aviso, cancelar=cancelar)
+        if df_ia is not None: partes.append(df_ia)
+    if not partes: return None
+
+    df = pd.concat(partes, ignore_index=True)
+    # Con líneas descartadas la extracción es parcial: no se guarda, para que la próxima vez se repita y avise
+    if usar_cache and not df.empty and not avisos:
+        cache_actas.guardar_df(clave_datos, df)
+    return df
+
+def procesar_archivos(archivos, api_key, max_concurrencia=MAX_CONCURRENCIA, base_url=None, on_progress=None, usar_cache=True, paralelo=True,
+                      registro=None, on_fila=None, on_aviso=None, cancelar=None):
+    """Procesa todas las actas a la vez con un pool de hilos acotado.
+
+    Devuelve ``(resultados, errores)``: ``resultados`` conserva el orden de subida
+    (``None`` en los archivos sin datos) y ``errores`` es una lista de ``(nombre, excepción)``.
+    ``on_progress(avance, total)`` se invoca siempre en el hilo llamante; ``avance`` es
+    el número de archivos completados, con fracción según las páginas ya leídas.
+    Con ``paralelo=False`` las páginas de cada PDF se leen en el propio hilo.
+    ``registro`` recoge tiempos, memoria y tokens por archivo (ver ``instrumentacion``).
+
+    ``on_fila(nombre, fila)`` y ``on_aviso(nombre, mensaje)`` reciben, también en el hilo
+    llamante, las filas que va devolviendo el modelo y las líneas descartadas. Si se
+    activa ``cancelar`` (o el hilo llamante se interrumpe) se cortan las llamadas en curso.
+    """
+    total = len(archivos)
+    resultados = [None] * total
+    errores = []
+    if total == 0: return resultados, errores
+    client = crear_cliente(api_key, base_url) if api_key else None
+    limitador = LimitadorTasa(max_concurrencia)
+    cancelar = cancelar or threading.Event()
+    # Los hilos solo escriben aquí; la barra la actualiza el hilo llamante (Streamlit lo exige)
+    avance = [0.0] * total
+    eventos = queue.SimpleQueue()
+
+    def _vaciar_eventos():
+        while True:
+            try: tipo, nombre, dato = eventos.get_nowait()
+            except queue.Empty: return
+            callback = on_fila if tipo == 'fila' else on_aviso
+            if callback: callback(nombre, dato)
+
+    def _marcar(i):
+        # La lectura de páginas cuenta como el 90% del archivo; el resto es la IA
+        return lambda hechas, n: avance.__setitem__(i, 0.9 * hechas / n)
+
+    def _emitir(tipo, nombre):
+        return lambda dato: eventos.put((tipo, nombre, dato))
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrencia, total)) as pool:
+        futuros = {
+            pool.submit(extraer_archivo, f.name, _leer_bytes(f), api_key, client, limitador,
+                        usar_cache, _marcar(i), paralelo, registro,
+                        _emitir('fila', f.name) if on_fila else None, _emitir('aviso', f.name) if on_aviso else None, cancelar): i
+            for i, f in enumerate(archivos)
+        }
+        pendientes = set(futuros)
+        try:
+            while pendientes:
+                hechos, pendientes = wait(pendientes, timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in hechos:
+                    i = futuros[fut]
+                    avance[i] = 1.0
+                    try: resultados[i] = fut.result()
+                    except Exception as e: errores.append((archivos[i].name, e))
+                _vaciar_eventos()
+                if on_progress: on_progress(sum(avance), total)
+        except BaseException:
+            # Streamlit interrumpe el script con una excepción: sin esto el pool esperaría a que acabasen las llamadas
+            cancelar.set()
+            raise
+    return resultados, errores
@@ -0,0 +1,84 @@
+import io
+from functools import lru_cache
+
+from matplotlib.figure import Figure
+
+# Las figuras se crean con la API orientada a objetos (sin pyplot): no quedan registradas
+# en el estado global, son seguras entre sesiones de Streamlit y se liberan al terminar.
+# Cada gráfico se memoriza como PNG según los datos que pinta.
+MAX_GRAFICOS = 32
+COLORES_SUSPENSOS = ['#2ecc71','#f1c40f','#e67e22','#e74c3c','#c0392b']
+
+
+def _a_png(fig):
+    try:
+        buf = io.BytesIO(); fig.savefig(buf, format='png', bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+def _conteos(res):
+    return (res['cero'], res['uno'], res['dos'], res['tres'], res['mas_tres'])
+
+# --- GRÁFICOS BASE ---
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_promocion(pasan, no_pasan):
+    fig = Figure(figsize=(4,3)); ax = fig.subplots()
+    ax.pie([pasan, no_pasan], labels=['Sí', 'No'], autopct='%1.f%%', colors=['#2ecc71','#e74c3c'])
+    return _a_png(fig)
+
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_suspensos(conteos):
+    fig = Figure(figsize=(4,3)); ax = fig.subplots()
+    ax.bar(['0','1','2','3','>3'], conteos, color='#3498db')
+    return _a_png(fig)
+
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_distribucion(conteos):
+    cero, uno, dos, tres, mas_tres = conteos
+    fig = Figure(figsize=(5,4)); ax = fig.subplots()
+    bars = ax.bar(['0', '1', '2', '>2'], [cero, uno, dos, tres+mas_tres], color='#3498db'); ax.bar_label(bars)
+    return _a_png(fig)
+
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_medias_materias(materias, medias):
+    fig = Figure(figsize=(10,5)); ax = fig.subplots()
+    bars = ax.bar(materias, medias, color='#9b59b6'); ax.bar_label(bars, fmt='%.2f')
+    return _a_png(fig)
+
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_promocion_barras(pasan, no_pasan):
+    fig = Figure(figsize=(8,3)); ax = fig.subplots()
+    ax.bar(['Sí', 'No'], [pasan, no_pasan], color=['green', 'red'])
+    return _a_png(fig)
+
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_suspensos_color(conteos):
+    fig = Figure(figsize=(6,4)); ax = fig.subplots()
+    bars = ax.bar(['0','1','2','3','>3'], conteos, color=COLORES_SUSPENSOS); ax.bar_label(bars)
+    return _a_png(fig)
+
+@lru_cache(maxsize=MAX_GRAFICOS)
+def png_pct_suspensos(materias, pcts):
+    fig = Figure(figsize=(6,4)); ax = fig.subplots()
+    ax.barh(materias, pcts, color='#3498db')
+    return _a_png(fig)
+
+# --- CONJUNTOS PARA LOS INFORMES ---
+def graficos_general(res):
+    """PNG de la pestaña General: promoción (tarta) y nº de suspensos."""
+    return png_promocion(res['pasan'], res['no_pasan']), png_suspensos(_conteos(res))
+
+def graficos_informe_global(res, stats_mat):
+    """Las cuatro imágenes que espera ``generate_global_report``, como BytesIO."""
+    d_gf = stats_mat.sort_values('Media', ascending=False)
+    pngs = [png_promocion(res['pasan'], res['no_pasan']),
+            png_distribucion(_conteos(res)),
+            png_medias_materias(tuple(d_gf['Materia']), tuple(d_gf['Media'])),
+            png_promocion_barras(res['pasan'], res['no_pasan'])]
+    return [io.BytesIO(p) for p in pngs]
+
+def graficos_padres(res, stats_mat):
+    """PNG de la pestaña Padres: suspensos por alumno y % de suspensos por materia."""
+    df_p2 = stats_mat.sort_values('Pct_Suspensos')
+    return png_suspensos_color(_conteos(res)), png_pct_suspensos(tuple(df_p2['Materia']), tuple(df_p2['Pct_Suspensos']))
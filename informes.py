@@ -0,0 +1,193 @@
+import io
+import re
+import zipfile
+from datetime import datetime
+
+from docx import Document
+from docx.shared import Inches, Pt, RGBColor
+from docx.enum.section import WD_ORIENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+import procesos
+
+# Por debajo de este nº de alumnos no compensa arrancar procesos
+ALUMNOS_MIN_PARALELO = 40
+
+
+# --- GENERACIÓN TEXTOS ---
+def generar_comentario_individual(alumno, datos_alumno):
+    suspensos = datos_alumno[datos_alumno['Nota'] < 5]
+    num = len(suspensos)
+    lista = suspensos['Materia'].tolist()
+    txt = f"El alumno/a {alumno} tiene actualmente {num} materias suspensas."
+    if num == 0: txt = "No tiene ninguna materia suspensa. ¡Excelente trabajo! Se recomienda mantener la constancia."
+    elif num == 1: txt += f" La materia es: {', '.join(lista)}. Recuperación factible con refuerzo."
+    elif num == 2: txt += f" Las materias son: {', '.join(lista)}. Situación límite. Organización urgente."
+    else: txt += f" Las materias son: {', '.join(lista)}. Situación preocupante que compromete la promoción."
+    return txt
+
+# --- WORD INDIVIDUAL ---
+def add_alumno_to_doc(doc, alumno, datos_alumno, media, suspensos, stats_mat):
+    doc.add_heading(f'Informe Individual: {alumno}', 0)
+    doc.add_paragraph(f"Nota Media: {media:.2f} | Materias Suspensas: {suspensos}").alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    doc.add_heading('Análisis y Recomendaciones', level=2)
+    p = doc.add_paragraph(generar_comentario_individual(alumno, datos_alumno))
+    p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+    
+    doc.add_heading('Detalle de Calificaciones', level=2)
+    t = doc.add_table(rows=1, cols=4); t.style = 'Table Grid'
+    hdr = t.rows[0].cells
+    hdr[0].text='Materia'; hdr[1].text='Nota'; hdr[2].text='Media Clase'; hdr[3].text='Dif.'
+    
+    medias = stats_mat.set_index('Materia')['Media'].to_dict()
+    for _, row in datos_alumno.iterrows():
+        c = t.add_row().cells
+        c[0].text = str(row['Materia']); c[1].text = str(row['Nota'])
+        mc = medias.get(row['Materia'], 0); c[2].text = f"{mc:.2f}"
+        dif = row['Nota'] - mc; c[3].text = f"{dif:+.2f}"
+        if row['Nota'] < 5:
+            c[1].paragraphs[0].runs[0].font.color.rgb = RGBColor(255,0,0); c[1].paragraphs[0].runs[0].bold = True
+
+    doc.add_paragraph("\n\n")
+    now = datetime.now()
+    meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+    fecha_str = f"En Salamanca, a {now.day} de {meses[now.month-1]} de {now.year}"
+    
+    p_f = doc.add_paragraph(fecha_str); p_f.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    doc.add_paragraph("\n")
+    p_s = doc.add_paragraph("El Tutor del grupo:"); p_s.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p_s.add_run("\n\n\n"); p_s.add_run("D. José Carlos Tejedor Lorenzo").bold = True
+
+def crear_informe_individual(alumno, datos_alumno, media, suspensos, stats_mat):
+    doc = Document()
+    add_alumno_to_doc(doc, alumno, datos_alumno, media, suspensos, stats_mat)
+    bio = io.BytesIO(); doc.save(bio); bio.seek(0)
+    return bio
+
+def _por_alumno(df, stats_al, orden_alumnos):
+    """Agrupa el acta una sola vez: ``[(alumno, datos_alumno, media, suspensos)]`` en orden."""
+    grupos = dict(tuple(df.groupby('Alumno', sort=False)))
+    info = stats_al.set_index('Alumno')
+    return [(al, grupos[al], info.at[al, 'Media'], info.at[al, 'Suspensos']) for al in orden_alumnos if al in grupos]
+
+def generar_informe_todos_alumnos(df, stats_al, stats_mat, orden_alumnos):
+    doc = Document()
+    alumnos = _por_alumno(df, stats_al, orden_alumnos)
+    for i, (al, d_al, media, suspensos) in enumerate(alumnos):
+        add_alumno_to_doc(doc, al, d_al, media, suspensos, stats_mat)
+        if i < len(alumnos)-1: doc.add_page_break()
+    bio = io.BytesIO(); doc.save(bio); bio.seek(0)
+    return bio
+
+# --- ZIP DE INFORMES INDIVIDUALES ---
+def _render_alumno(args):
+    alumno, datos_alumno, media, suspensos, stats_mat = args
+    return crear_informe_individual(alumno, datos_alumno, media, suspensos, stats_mat).getvalue()
+
+def nombre_archivo(texto):
+    return re.sub(r'[^\w\- ]', '', str(texto)).strip().replace(' ', '_') or "alumno"
+
+def generar_zip_alumnos(df, stats_al, stats_mat, orden_alumnos, destino=None, incluir_combinado=False, paralelo=True):
+    """Escribe un .docx por alumno (y opcionalmente el documento combinado) en un ZIP.
+
+    Los informes se generan en un pool de procesos y se van volcando al ZIP en el
+    orden de ``orden_alumnos`` según terminan. ``destino`` puede ser cualquier
+    fichero binario; si se omite se devuelve un BytesIO.
+    """
+    destino = destino if destino is not None else io.BytesIO()
+    alumnos = _por_alumno(df, stats_al, orden_alumnos)
+    tareas = [(al, d_al, media, suspensos, stats_mat) for al, d_al, media, suspensos in alumnos]
+    if paralelo and procesos.NUCLEOS > 1 and len(tareas) >= ALUMNOS_MIN_PARALELO:
+        docs = procesos.mapear(_render_alumno, tareas, chunksize=max(1, len(tareas) // (procesos.NUCLEOS * 4)))
+    else:
+        docs = map(_render_alumno, tareas)
+
+    ancho = len(str(len(tareas)))
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for i, ((al, *_), contenido) in enumerate(zip(tareas, docs), start=1):
+            zf.writestr(f"{i:0{ancho}d}_{nombre_archivo(al)}.docx", contenido)
+        if incluir_combinado:
+            zf.writestr("Todos.docx", generar_informe_todos_alumnos(df, stats_al, stats_mat, orden_alumnos).getvalue())
+    if isinstance(destino, io.BytesIO): destino.seek(0)
+    return destino
+
+# --- WORD GLOBAL ---
+def generate_global_report(datos_resumen, plots, ranking_materias, centro, grupo, stats_al):
+    doc = Document()
+    s = doc.sections[0]; s.orientation = WD_ORIENT.LANDSCAPE; s.page_width, s.page_height = s.page_height, s.page_width
+    
+    doc.add_heading(f'Informe de Evaluación - {centro}', 0)
+    doc.add_heading('1. Datos Generales y Promoción', 1)
+    
+    doc.add_paragraph(f"a) Grupo evaluado: {grupo}")
+    doc.add_paragraph(f"b) Número de alumnos: {datos_resumen['total_alumnos']}")
+    doc.add_paragraph(f"c) Media del grupo: {datos_resumen['media_grupo']:.2f}")
+    
+    doc.add_heading('Nivel de Promoción:', 2)
+    p = doc.add_paragraph()
+    p.add_run(f"- 0 suspensos: {datos_resumen['cero']} ({datos_resumen['pct_cero']:.1f}%)\n")
+    p.add_run(f"- 1 suspenso: {datos_resumen['uno']} ({datos_resumen['pct_uno']:.1f}%)\n")
+    p.add_run(f"- 2 suspensos: {datos_resumen['dos']} ({datos_resumen['pct_dos']:.1f}%)\n")
+    p.add_run(f"- 3 suspensos: {datos_resumen['tres']} ({datos_resumen['pct_tres']:.1f}%)\n")
+    p.add_run(f"- >3 suspensos: {datos_resumen['mas_tres']} ({datos_resumen['pct_mas_tres']:.1f}%)")
+    
+    doc.add_paragraph(f"PROMOCIONAN (0-2 susp): {datos_resumen['pasan']} ({datos_resumen['pct_pasan']:.1f}%)").bold = True
+    doc.add_paragraph(f"NO PROMOCIONAN (>2 susp): {datos_resumen['no_pasan']} ({datos_resumen['pct_no_pasan']:.1f}%)").bold = True
+    
+    doc.add_heading('2. Análisis de Resultados', 1)
+    
+    doc.add_paragraph("a) Asignaturas con mejores resultados (Top 4):").bold = True
+    top_m = ranking_materias.sort_values(by=['Pct_Aprobados', 'Media'], ascending=[False, False]).head(4)
+    for _, r in top_m.iterrows(): doc.add_paragraph(f"   - {r['Materia']}: {r['Pct_Aprobados']:.1f}% aprobados, media {r['Media']:.2f}")
+
+    doc.add_paragraph("\nb) Asignaturas con peores resultados (Bottom 4):").bold = True
+    bot_m = ranking_materias.sort_values(by=['Pct_Aprobados', 'Media'], ascending=[True, True]).head(4)
+    for _, r in bot_m.iterrows(): doc.add_paragraph(f"   - {r['Materia']}: {r['Pct_Aprobados']:.1f}% aprobados, media {r['Media']:.2f}")
+
+    doc.add_paragraph("\nc) Alumnos con mejores resultados (Top 3):").bold = True
+    top_al = stats_al.sort_values(by='Media', ascending=False).head(3)
+    i=1
+    for _, r in top_al.iterrows(): doc.add_paragraph(f"   {i}- {r['Alumno']} (Media: {r['Media']:.2f})"); i+=1
+
+    doc.add_paragraph("\nd) Alumnos con peores resultados (Bottom 3):").bold = True
+    bot_al = stats_al.sort_values(by='Media', ascending=True).head(3)
+    i=1
+    for _, r in bot_al.iterrows(): doc.add_paragraph(f"   {i}- {r['Alumno']} (Media: {r['Media']:.2f})"); i+=1
+
+    doc.add_heading('3. Valoración', 1)
+    doc.add_paragraph(datos_resumen['valoracion']).italic = True
+    
+    doc.add_heading('4. Gráficas', 1)
+    if len(plots) >= 4:
+        t = doc.add_table(rows=2, cols=2); t.autofit = True
+        t.rows[0].cells[0].paragraphs[0].add_run().add_picture(plots[0], width=Inches(4.5))
+        t.rows[0].cells[1].paragraphs[0].add_run().add_picture(plots[3], width=Inches(4.5))
+        t.rows[1].cells[0].paragraphs[0].add_run().add_picture(plots[2], width=Inches(4.5))
+        t.rows[1].cells[1].paragraphs[0].add_run().add_picture(plots[1], width=Inches(4.5))
+    bio = io.BytesIO(); doc.save(bio); bio.seek(0)
+    return bio
+
+def generate_parents_report(res, stats_mat, plot_suspensos, plot_pct_materias):
+    doc = Document()
+    s = doc.sections[0]; s.orientation = WD_ORIENT.LANDSCAPE; s.page_width, s.page_height = s.page_height, s.page_width
+    doc.add_heading('RESUMEN DE EVALUACIÓN PARA FAMILIAS', 0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    t = doc.add_table(rows=1, cols=2); t.autofit = False
+    t.columns[0].width = Inches(5); t.columns[1].width = Inches(5)
+    
+    c1 = t.rows[0].cells[0].paragraphs[0]
+    c1.add_run("Resumen estadístico.\n\n").italic = True
+    c1.add_run(f"• Promocionan: {res['pasan']} ({res['pct_pasan']:.1f}%)\n")
+    c1.add_run(f"• No promocionan: {res['no_pasan']} ({res['pct_no_pasan']:.1f}%)\n")
+    c1.add_run(f"• Media suspensos: {res['media_suspensos_grupo']:.2f}\n\n")
+    c1.add_run("Aprobados por materia:\n").bold = True
+    for _, row in stats_mat.iterrows(): c1.add_run(f"- {row['Materia']}: {row['Pct_Aprobados']:.1f}%\n")
+    
+    c2 = t.rows[0].cells[1]
+    c2.paragraphs[0].add_run("Materias no superadas:\n").bold = True
+    c2.paragraphs[0].add_run().add_picture(plot_suspensos, width=Inches(4.5))
+    c2.add_paragraph("\n% Suspensos por Materia:\n").bold = True
+    c2.paragraphs[1].add_run().add_picture(plot_pct_materias, width=Inches(4.5))
+    
+    bio = io.BytesIO(); doc.save(bio); bio.seek(0)
+    return bio
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# USD por millón de tokens (entrada, salida)
+PRECIOS = {"gpt-4o": (2.50, 10.00), "gpt-4o-mini": (0.15, 0.60)}
+MAX_REGISTROS = 2000
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def memoria_mb():
+    """Memoria residente actual del proceso (o el pico si el sistema no expone la actual; 0 en Windows)."""
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * _PAGINA / 2**20
+    except OSError:
+        try: import resource  # solo Unix
+        except ImportError: return 0.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def coste(modelo, prompt_tokens, completion_tokens):
+    entrada, salida = PRECIOS.get(modelo, (0.0, 0.0))
+    return (prompt_tokens * entrada + completion_tokens * salida) / 1e6
+
+
+class Registro:
+    """Tiempos y memoria por etapa y archivo, y tokens/coste de cada llamada al modelo.
+
+    Es seguro entre hilos. La memoria es la variación de la residente del proceso:
+    con etapas simultáneas (varios archivos a la vez) es orientativa. El detalle guarda
+    los últimos ``MAX_REGISTROS``; los totales por etapa y por modelo no se pierden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.etapas = deque(maxlen=MAX_REGISTROS)
+        self.llamadas = deque(maxlen=MAX_REGISTROS)
+        self.totales_etapas = {}
+        self.totales_llamadas = {}
+
+    @contextmanager
+    def etapa(self, nombre, archivo=None):
+        mem, inicio, t = memoria_mb(), time.time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            fila = {'etapa': nombre, 'archivo': archivo, 'inicio': inicio,
+                    'segundos': time.perf_counter() - t, 'memoria_mb': memoria_mb() - mem}
+            with self._lock:
+                self.etapas.append(fila)
+                t = self.totales_etapas.setdefault(nombre, {'veces': 0, 'segundos': 0.0, 'memoria_max_mb': fila['memoria_mb']})
+                t['veces'] += 1; t['segundos'] += fila['segundos']
+                t['memoria_max_mb'] = max(t['memoria_max_mb'], fila['memoria_mb'])
+
+    def llamada(self, modelo, archivo, uso, segundos, primer_token=None):
+        prompt = getattr(uso, 'prompt_tokens', 0) or 0
+        completion = getattr(uso, 'completion_tokens', 0) or 0
+        fila = {'modelo': modelo, 'archivo': archivo, 'segundos': segundos, 'primer_token_s': primer_token, 'prompt_tokens': prompt,
+                'completion_tokens': completion, 'coste_usd': coste(modelo, prompt, completion)}
+        with self._lock:
+            self.llamadas.append(fila)
+            t = self.totales_llamadas.setdefault(modelo, {'llamadas': 0, 'segundos': 0.0, 'primer_token_s': 0.0, 'con_primer_token': 0,
+                                                          'prompt_tokens': 0, 'completion_tokens': 0, 'coste_usd': 0.0})
+            t['llamadas'] += 1; t['segundos'] += segundos
+            t['prompt_tokens'] += prompt; t['completion_tokens'] += completion; t['coste_usd'] += fila['coste_usd']
+            if primer_token is not None: t['primer_token_s'] += primer_token; t['con_primer_token'] += 1
+
+    def vaciar(self):
+        """Borra el detalle y los totales (para Prometheus, un reinicio de los contadores)."""
+        with self._lock:
+            self.etapas.clear(); self.llamadas.clear()
+            self.totales_etapas.clear(); self.totales_llamadas.clear()
+
+    # --- RESÚMENES ---
+    def df_etapas(self):
+        with self._lock: return pd.DataFrame(list(self.etapas), columns=['etapa', 'archivo', 'inicio', 'segundos', 'memoria_mb'])
+
+    def df_llamadas(self):
+        with self._lock:
+            df = pd.DataFrame(list(self.llamadas), columns=['modelo', 'archivo', 'segundos', 'primer_token_s',
+                                                           'prompt_tokens', 'completion_tokens', 'coste_usd'])
+        return df.astype({'primer_token_s': float})
+
+    def resumen_etapas(self):
+        return (self.df_etapas().groupby('etapa', sort=False)
+                .agg(Veces=('segundos', 'count'), Total_s=('segundos', 'sum'), Media_s=('segundos', 'mean'),
+                     Max_s=('segundos', 'max'), Memoria_max_mb=('memoria_mb', 'max')).reset_index())
+
+    def resumen_llamadas(self):
+        return (self.df_llamadas().groupby('modelo')
+                .agg(Llamadas=('segundos', 'count'), Total_s=('segundos', 'sum'), Primer_token_s=('primer_token_s', 'mean'), Prompt=('prompt_tokens', 'sum'),
+                     Completion=('completion_tokens', 'sum'), Coste_usd=('coste_usd', 'sum')).reset_index())
+
+    # --- EXPORTACIÓN ---
+    def a_json(self):
+        with self._lock:
+            return json.dumps({'etapas': list(self.etapas), 'llamadas': list(self.llamadas)}, ensure_ascii=False, indent=2, default=str)
+
+    def a_prometheus(self, prefijo="analizador_actas"):
+        """Totales acumulados en formato de texto de Prometheus."""
+        def _e(v): return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        lineas = []
+        def _metrica(nombre, tipo, ayuda, valores):
+            lineas.append(f"# HELP {prefijo}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {prefijo}_{nombre} {tipo}")
+            for etiquetas, valor in valores:
+                et = ",".join(f'{k}="{_e(v)}"' for k, v in etiquetas.items())
+                lineas.append(f"{prefijo}_{nombre}{{{et}}} {valor:g}")
+
+        with self._lock:
+            etapas = [(e, dict(t)) for e, t in self.totales_etapas.items()]
+            llamadas = [(m, dict(t)) for m, t in self.totales_llamadas.items()]
+        _metrica("etapa_segundos_total", "counter", "Tiempo acumulado por etapa.",
+                 [({'etapa': e}, t['segundos']) for e, t in etapas])
+        _metrica("etapa_ejecuciones_total", "counter", "Ejecuciones de cada etapa.",
+                 [({'etapa': e}, t['veces']) for e, t in etapas])
+        _metrica("etapa_memoria_max_mb", "gauge", "Mayor incremento de memoria residente en una ejecución.",
+                 [({'etapa': e}, t['memoria_max_mb']) for e, t in etapas])
+        _metrica("modelo_llamadas_total", "counter", "Llamadas al modelo.",
+                 [({'modelo': m}, t['llamadas']) for m, t in llamadas])
+        _metrica("modelo_segundos_total", "counter", "Tiempo acumulado en llamadas al modelo.",
+                 [({'modelo': m}, t['segundos']) for m, t in llamadas])
+        _metrica("modelo_primer_token_segundos", "gauge", "Tiempo medio hasta el primer token.",
+                 [({'modelo': m}, t['primer_token_s'] / t['con_primer_token']) for m, t in llamadas if t['con_primer_token']])
+        _metrica("modelo_tokens_total", "counter", "Tokens consumidos por tipo.",
+                 [({'modelo': m, 'tipo': tipo}, t[f'{tipo}_tokens']) for m, t in llamadas for tipo in ("prompt", "completion")])
+        _metrica("modelo_coste_usd_total", "counter", "Coste estimado en USD.",
+                 [({'modelo': m}, t['coste_usd']) for m, t in llamadas])
+        return "\n".join(lineas) + "\n"
+
+
+class _RegistroNulo:
+    """Registro que no guarda nada, para no comprobar ``if registro`` en cada llamada."""
+
+    def etapa(self, nombre, archivo=None):
+        return nullcontext()
+
+    def llamada(self, modelo, archivo, uso, segundos, primer_token=None):
+        pass
+
+NULO = _RegistroNulo()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+NOTA_APROBADO = 5
+
+
+def codificar(df):
+    """Códigos categóricos de alumnos y materias de un acta larga.
+
+    Los alumnos conservan el orden de aparición (el de ``orden_alumnos``) y las
+    materias se ordenan alfabéticamente, como las columnas del antiguo ``pivot_table``.
+    Devuelve ``(cod_alumno, alumnos, cod_materia, materias)``.
+    """
+    cod_alumno, alumnos = pd.factorize(df['Alumno'], sort=False)
+    cod_materia, materias = pd.factorize(df['Materia'], sort=True)
+    return cod_alumno, pd.Index(alumnos, name='Alumno'), cod_materia, pd.Index(materias, name='Materia')
+
+
+class MatrizNotas:
+    """Notas de un grupo como matriz float32 alumnos × materias (NaN = sin nota).
+
+    ``a_dataframe`` comparte memoria con la matriz: el pivote del editor no copia
+    datos. Los nombres se guardan una sola vez en ``alumnos`` y ``materias``; la
+    posición en esos índices es el código categórico.
+    """
+
+    __slots__ = ('alumnos', 'materias', 'notas')
+
+    def __init__(self, alumnos, materias, notas):
+        self.alumnos = alumnos
+        self.materias = materias
+        self.notas = notas
+
+    @classmethod
+    def desde_codigos(cls, cod_alumno, alumnos, cod_materia, materias, notas):
+        matriz = np.full((len(alumnos), len(materias)), np.nan, dtype=np.float32)
+        matriz[cod_alumno, cod_materia] = notas
+        return cls(alumnos, materias, matriz)
+
+    @classmethod
+    def desde_largo(cls, df):
+        cod_alumno, alumnos, cod_materia, materias = codificar(df)
+        return cls.desde_codigos(cod_alumno, alumnos, cod_materia, materias, df['Nota'].to_numpy(dtype=np.float32))
+
+    def copia(self):
+        return MatrizNotas(self.alumnos, self.materias, self.notas.copy())
+
+    # --- VISTAS ---
+    def a_dataframe(self):
+        """Pivote alumnos × materias para el editor, sin copiar la matriz."""
+        return pd.DataFrame(self.notas, index=self.alumnos, columns=self.materias, copy=False)
+
+    # --- AGREGADOS ---
+    def suspensos_por_alumno(self):
+        return (self.notas < NOTA_APROBADO).sum(axis=1)
+
+    # --- MODIFICACIÓN ---
+    def fijar(self, alumno, materia, nota):
+        self.notas[self.alumnos.get_loc(alumno), self.materias.get_loc(materia)] = nota
+
+    def quitar(self, alumnos=(), materias=()):
+        """Devuelve una matriz sin los alumnos/materias indicados."""
+        filas = ~self.alumnos.isin(alumnos); cols = ~self.materias.isin(materias)
+        return MatrizNotas(self.alumnos[filas], self.materias[cols], self.notas[np.ix_(filas, cols)])
@@ -0,0 +1,154 @@
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+UMBRAL_SIMILITUD = 0.9
+# Cada nombre se indexa bajo los códigos fonéticos de sus BLOQUES_POR_NOMBRE palabras menos frecuentes
+BLOQUES_POR_NOMBRE = 2
+LARGO_CODIGO = 4
+PARTICULAS = {"de", "del", "la", "las", "los", "y", "i", "da", "van", "von"}
+# Equivalencias ortográficas del castellano, en orden, sobre texto ya sin tildes y en minúsculas.
+# Sin lookahead ni referencias: las cadenas de pandas usan el motor RE2 de Arrow
+_FONETICA = [(r'h', ''), (r'[vw]', 'b'), (r'z', 's'), (r'c([ei])', r's\1'), (r'qu', 'k'), (r'c', 'k'),
+             (r'g([ei])', r'j\1'), (r'll', 'y'), (r'x', 'ks'), *((c + c, c) for c in "bdfkmnprst")]
+
+
+# --- LIMPIEZA ---
+def limpiar_nombre_alumno(texto):
+    if not isinstance(texto, str): return str(texto)
+    texto = texto.strip()
+    texto = re.sub(r'^\d+[\.\-\s]+', '', texto) # Quitar índice
+    if ',' in texto:
+        partes = texto.split(',')
+        if len(partes) >= 2:
+            apellidos = partes[0].strip()
+            nombre = partes[1].strip()
+            return f"{nombre} {apellidos}"
+    return texto
+
+def limpiar_nombres(serie):
+    """Versión vectorizada de ``limpiar_nombre_alumno`` para una Serie completa.
+
+    Limpia cada nombre distinto una sola vez: en un acta larga cada alumno se repite
+    en todas sus materias.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    texto = pd.Series(unicos, dtype=object).astype(str).str.strip()
+    texto = texto.str.replace(r'^\d+[\.\-\s]+', '', regex=True) # Quitar índice
+    partes = texto.str.extract(r'^([^,]*),([^,]*)')
+    texto = texto.where(partes[0].isna(), partes[1].str.strip() + " " + partes[0].str.strip())
+    return pd.Series(texto.to_numpy()[codigos], index=serie.index, name=serie.name)
+
+# --- CLAVES ---
+def normalizar(nombres):
+    """Clave de comparación de cada nombre limpio: sin tildes, mayúsculas ni signos
+    ("Pérez García, Juan" == "JUAN PEREZ GARCIA").
+
+    Conserva las cifras, las partículas y el orden de las palabras: "García López" y
+    "López García" son personas distintas.
+    """
+    originales = pd.Series(nombres, dtype=object).astype(str).reset_index(drop=True)
+    claves = (originales.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+              .str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip())
+    # Un "nombre" sin letras ni cifras no debe coincidir con todos los demás vacíos
+    return claves.where(claves != "", originales)
+
+def clave_fonetica(palabras, largo=LARGO_CODIGO):
+    """Código fonético aproximado (castellano) de cada palabra, truncado a ``largo``."""
+    codigo = pd.Series(palabras, dtype=object).astype(str)
+    for patron, sustituto in _FONETICA:
+        codigo = codigo.str.replace(patron, sustituto, regex=True)
+    return codigo.str[:largo]
+
+# --- EMPAREJAMIENTO ---
+def _candidatos(claves):
+    """Pares de claves que comparten bloque.
+
+    Cada clave entra solo en los bloques de sus palabras más raras, así que los
+    bloques son pequeños y el coste crece casi linealmente con el número de nombres.
+    """
+    if len(claves) < 2: return []
+    palabras = pd.Series(claves, dtype=object).str.split().explode().dropna()
+    palabras = palabras[(palabras.str.len() >= 3) & ~palabras.isin(PARTICULAS)]
+    bloques = pd.DataFrame({'clave': palabras.index, 'codigo': clave_fonetica(palabras).to_numpy()}).drop_duplicates()
+    bloques['frecuencia'] = bloques.groupby('codigo')['clave'].transform('size')
+    bloques = bloques.sort_values(['clave', 'frecuencia', 'codigo'], kind='stable').groupby('clave').head(BLOQUES_POR_NOMBRE)
+    miembros = defaultdict(list)
+    for clave, codigo in zip(bloques['clave'].tolist(), bloques['codigo'].tolist()): miembros[codigo].append(clave)
+    pares = set()
+    for bloque in miembros.values():
+        pares.update(combinations(sorted(bloque), 2))
+    return sorted(pares)
+
+def _contenida(corta, larga):
+    """Si las palabras de ``corta`` aparecen en ``larga`` y en el mismo orden."""
+    resto = iter(larga)
+    return all(p in resto for p in corta)
+
+def similitud(a, b, umbral=0.0):
+    """Similitud entre dos claves: 1 si una es la otra con palabras de menos en el mismo
+    orden (falta un apellido), si no la razón de ``difflib``. Devuelve 0 en cuanto las
+    cotas rápidas de ``difflib`` quedan por debajo de ``umbral``."""
+    corta, larga = sorted((a.split(), b.split()), key=len)
+    if 2 <= len(corta) < len(larga) and _contenida(corta, larga): return 1.0
+    sm = SequenceMatcher(None, a, b)
+    if sm.real_quick_ratio() < umbral or sm.quick_ratio() < umbral: return 0.0
+    return sm.ratio()
+
+def unificar_alumnos(df, umbral=UMBRAL_SIMILITUD):
+    """Limpia ``df['Alumno']`` y da el mismo nombre a las variantes de un alumno.
+
+    Cada nombre distinto se une con los de su misma clave (``normalizar``) y después,
+    por similitud, con los de su bloque fonético. Dos nombres con nota en una misma
+    materia son alumnos distintos y nunca se unen, tampoco con la misma clave. Cada
+    alumno toma el nombre con más filas (a igualdad, el que aparece antes). Devuelve
+    una copia.
+    """
+    mostrados = limpiar_nombres(df['Alumno'])
+    cod_nombre, nombres = pd.factorize(mostrados)
+    if len(nombres) < 2: return df.assign(Alumno=mostrados)
+    claves = normalizar(nombres).tolist()
+    validas = cod_nombre >= 0
+    nombre_fila = cod_nombre[validas]
+
+    # Union-find sobre los nombres; las materias de cada uno, como máscara de bits
+    padre = list(range(len(nombres)))
+    cod_materia, _ = pd.factorize(df['Materia'].to_numpy()[validas])
+    materias = [0] * len(nombres)
+    for n, m in set(zip(nombre_fila.tolist(), cod_materia.tolist())): materias[n] |= 1 << m
+    def _raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]; i = padre[i]
+        return i
+
+    # Quien tiene nota en todas las materias choca con cualquier otro: solo se buscan parejas
+    # entre los incompletos (en un acta única, casi nadie), y el cruce de materias va antes que difflib
+    completa = (1 << (cod_materia.max() + 1)) - 1 if len(cod_materia) else 0
+    abiertas = [k for k, m in enumerate(materias) if m != completa]
+    por_clave = defaultdict(list)
+    for k in abiertas: por_clave[claves[k]].append(k)
+    pares = [(1.0, a, b) for grupo in por_clave.values() for a, b in combinations(grupo, 2) if not materias[a] & materias[b]]
+    distintas = list(por_clave)
+    for i, j in _candidatos(distintas):
+        s = similitud(distintas[i], distintas[j], umbral)
+        if s >= umbral:
+            pares += [(s, a, b) for a in por_clave[distintas[i]] for b in por_clave[distintas[j]] if not materias[a] & materias[b]]
+    for _, a, b in sorted(pares, key=lambda p: (-p[0], p[1], p[2])):
+        ra, rb = _raiz(a), _raiz(b)
+        if ra == rb or materias[ra] & materias[rb]: continue
+        padre[rb] = ra; materias[ra] |= materias[rb]
+
+    # Nombre mostrado de cada alumno
+    filas = np.bincount(nombre_fila, minlength=len(nombres))
+    elegido = {}
+    for i in range(len(nombres)):
+        r = _raiz(i)
+        if r not in elegido or filas[i] > filas[elegido[r]]: elegido[r] = i
+    nombres = nombres.to_numpy(dtype=object)
+    canonico = nombres[[elegido[_raiz(i)] for i in range(len(nombres))]]
+    alumno = pd.Series(np.where(validas, canonico[np.maximum(cod_nombre, 0)], None), index=df.index, name='Alumno')
+    return df.assign(Alumno=alumno.where(validas, mostrados))
@@ -0,0 +1,175 @@
+"""Procesa sin interfaz todas las actas de un centro.
+
+Estructura esperada: una carpeta por grupo dentro de ``raiz``, con sus actas
+(.xlsx, .pdf, .docx). Para cada grupo se generan el informe global, el de
+familias y el ZIP de informes individuales, y al final un resumen del centro.
+Con ``--evaluacion`` cada grupo se guarda además en el almacén de evaluaciones.
+
+    python procesar_centro.py actas/ --salida informes/ --centro "IES Lucía de Medrano" --curso 2024-2025
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+import almacen
+import estadisticas
+import graficos
+import informes
+from extraccion import MAX_CONCURRENCIA, procesar_archivos
+from procesos import NUCLEOS
+
+EXTENSIONES = ('.xlsx', '.pdf', '.docx', '.doc')
+ETAPAS = ('extraccion', 'estadisticas', 'graficos', 'informes')
+
+
+def _leer_actas(carpeta):
+    archivos = []
+    for ruta in sorted(carpeta.iterdir()):
+        if ruta.is_file() and ruta.suffix.lower() in EXTENSIONES:
+            f = io.BytesIO(ruta.read_bytes()); f.name = ruta.name
+            archivos.append(f)
+    return archivos
+
+def procesar_grupo(carpeta, salida, centro, curso, api_key=None, base_url=None, usar_cache=True, combinado=False,
+                   evaluacion=None, max_concurrencia=MAX_CONCURRENCIA):
+    """Procesa las actas de un grupo y escribe sus informes en ``salida/<grupo>``.
+
+    ``max_concurrencia`` limita las llamadas simultáneas al modelo de este grupo.
+
+    Devuelve un diccionario con el resumen del grupo, los errores, los avisos
+    (líneas del modelo descartadas) y los tiempos (segundos) y elementos
+    procesados de cada etapa.
+    """
+    carpeta = Path(carpeta); grupo = carpeta.name
+    destino = Path(salida) / grupo
+    tiempos, cantidades, errores, avisos = {}, {}, [], []
+
+    t = time.perf_counter()
+    archivos = _leer_actas(carpeta)
+    # Ya estamos en un proceso por grupo: las páginas se leen en este mismo proceso
+    resultados, fallos = procesar_archivos(archivos, api_key, max_concurrencia, base_url=base_url, usar_cache=usar_cache, paralelo=False,
+                                           on_aviso=lambda nombre, msg: avisos.append(f"{nombre}: {msg}"))
+    errores += [f"{nombre}: {e}" for nombre, e in fallos]
+    dfs = [df_t for df_t in resultados if df_t is not None]
+    tiempos['extraccion'] = time.perf_counter() - t; cantidades['extraccion'] = len(archivos)
+    resumen = {'Grupo': grupo, 'Archivos': len(archivos), 'Errores': len(errores), 'Avisos': len(avisos)}
+    if not dfs:
+        return {'resumen': resumen, 'errores': errores or ["No se extrajeron datos."], 'avisos': avisos,
+                'tiempos': tiempos, 'cantidades': cantidades}
+
+    t = time.perf_counter()
+    est = estadisticas.calcular(pd.concat(dfs, ignore_index=True))
+    res = est.res
+    tiempos['estadisticas'] = time.perf_counter() - t; cantidades['estadisticas'] = res['total_alumnos']
+
+    t = time.perf_counter()
+    plots = graficos.graficos_informe_global(res, est.stats_mat)
+    png_p1, png_p2 = graficos.graficos_padres(res, est.stats_mat)
+    tiempos['graficos'] = time.perf_counter() - t; cantidades['graficos'] = len(plots) + 2
+
+    t = time.perf_counter()
+    destino.mkdir(parents=True, exist_ok=True)
+    (destino / f"Global_{grupo}.docx").write_bytes(
+        informes.generate_global_report(res, plots, est.stats_mat, centro, grupo, est.stats_al).getvalue())
+    (destino / f"Padres_{grupo}.docx").write_bytes(
+        informes.generate_parents_report(res, est.stats_mat, io.BytesIO(png_p1), io.BytesIO(png_p2)).getvalue())
+    with open(destino / f"Alumnos_{grupo}.zip", 'wb') as zf:
+        informes.generar_zip_alumnos(est.df, est.stats_al, est.stats_mat, est.orden_alumnos, destino=zf,
+                                     incluir_combinado=combinado, paralelo=False)
+    if evaluacion: almacen.guardar(centro, curso, grupo, evaluacion, est)
+    tiempos['informes'] = time.perf_counter() - t; cantidades['informes'] = res['total_alumnos'] + 2
+
+    resumen.update({'Centro': centro, 'Curso': curso, 'Alumnos': res['total_alumnos'], 'Media': res['media_grupo'],
+                    'Promocionan': res['pasan'], 'Pct_Promocionan': res['pct_pasan'],
+                    'No_Promocionan': res['no_pasan'], 'Pct_No_Promocionan': res['pct_no_pasan']})
+    return {'resumen': resumen, 'errores': errores, 'avisos': avisos, 'tiempos': tiempos, 'cantidades': cantidades}
+
+def _fallido(carpeta, error):
+    return {'resumen': {'Grupo': carpeta.name, 'Errores': 1}, 'errores': [str(error)], 'avisos': [],
+            'tiempos': {}, 'cantidades': {}}
+
+def procesar_centro(raiz, salida, centro, curso, api_key=None, base_url=None, workers=NUCLEOS,
+                    usar_cache=True, combinado=False, on_grupo=None, evaluacion=None, max_concurrencia=MAX_CONCURRENCIA):
+    """Procesa cada subcarpeta de ``raiz`` como un grupo, en procesos en paralelo.
+
+    ``max_concurrencia`` es el total de llamadas simultáneas al modelo: se reparte
+    entre los procesos, porque cada uno tiene su propio ``LimitadorTasa``.
+
+    Devuelve ``(resumen, rendimiento)``: un DataFrame con una fila por grupo y otro
+    con el tiempo acumulado y el rendimiento de cada etapa.
+    """
+    raiz = Path(raiz); Path(salida).mkdir(parents=True, exist_ok=True)
+    carpetas = sorted(p for p in raiz.iterdir() if p.is_dir())
+    inicio = time.perf_counter()
+    resultados = []
+    if workers > 1 and len(carpetas) > 1:
+        n_workers = min(workers, len(carpetas))
+        args = (salida, centro, curso, api_key, base_url, usar_cache, combinado, evaluacion, max(1, max_concurrencia // n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futuros = {pool.submit(procesar_grupo, c, *args): c for c in carpetas}
+            for fut in as_completed(futuros):
+                try: resultados.append(fut.result())
+                except Exception as e: resultados.append(_fallido(futuros[fut], e))
+                if on_grupo: on_grupo(resultados[-1])
+    else:
+        args = (salida, centro, curso, api_key, base_url, usar_cache, combinado, evaluacion, max_concurrencia)
+        for c in carpetas:
+            try: resultados.append(procesar_grupo(c, *args))
+            except Exception as e: resultados.append(_fallido(c, e))
+            if on_grupo: on_grupo(resultados[-1])
+    total = time.perf_counter() - inicio
+
+    resumen = pd.DataFrame([r['resumen'] for r in resultados])
+    if not resumen.empty: resumen = resumen.sort_values('Grupo').reset_index(drop=True)
+    filas = []
+    for etapa in ETAPAS:
+        segundos = sum(r['tiempos'].get(etapa, 0.0) for r in resultados)
+        cantidad = sum(r['cantidades'].get(etapa, 0) for r in resultados)
+        filas.append({'Etapa': etapa, 'Segundos': segundos, 'Elementos': cantidad,
+                      'Por_segundo': cantidad / segundos if segundos else float('nan')})
+    filas.append({'Etapa': 'total (reloj)', 'Segundos': total, 'Elementos': len(carpetas),
+                  'Por_segundo': len(carpetas) / total if total else float('nan')})
+    return resumen, pd.DataFrame(filas)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procesa las actas de todos los grupos de un centro.")
+    parser.add_argument("raiz", help="carpeta con una subcarpeta de actas por grupo")
+    parser.add_argument("--salida", default="informes", help="carpeta donde escribir los informes")
+    parser.add_argument("--centro", default="IES Lucía de Medrano")
+    parser.add_argument("--curso", default="2024-2025")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"), help="por defecto OPENAI_API_KEY")
+    parser.add_argument("--base-url", default=None, help="endpoint compatible con OpenAI (p. ej. un mock local)")
+    parser.add_argument("--workers", type=int, default=NUCLEOS, help="grupos procesados a la vez")
+    parser.add_argument("--max-concurrencia", type=int, default=MAX_CONCURRENCIA,
+                        help="llamadas simultáneas al modelo en total, repartidas entre los workers")
+    parser.add_argument("--sin-cache", action="store_true", help="no leer ni escribir la caché de actas")
+    parser.add_argument("--combinado", action="store_true", help="añadir al ZIP un documento con todos los alumnos")
+    parser.add_argument("--evaluacion", help="guardar cada grupo con este nombre de evaluación (p. ej. \"1ª Evaluación\")")
+    args = parser.parse_args(argv)
+
+    def _informar(r):
+        estado = f"{r['resumen']['Alumnos']} alumnos" if 'Alumnos' in r['resumen'] else "sin datos"
+        print(f"[{r['resumen']['Grupo']}] {estado} en {sum(r['tiempos'].values()):.1f}s")
+        for e in r['errores']: print(f"    ! {e}", file=sys.stderr)
+        for a in r['avisos']: print(f"    ? {a}", file=sys.stderr)
+
+    resumen, rendimiento = procesar_centro(args.raiz, args.salida, args.centro, args.curso, args.api_key, args.base_url,
+                                           args.workers, not args.sin_cache, args.combinado, on_grupo=_informar,
+                                           evaluacion=args.evaluacion, max_concurrencia=args.max_concurrencia)
+    if resumen.empty:
+        print("No se encontraron grupos con actas.", file=sys.stderr)
+        return 1
+    resumen.to_excel(Path(args.salida) / "resumen_centro.xlsx", index=False)
+    print("\nRendimiento por etapa:")
+    print(rendimiento.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    return 0 if resumen['Errores'].sum() == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+NUCLEOS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+_pool = None
+_lock = threading.Lock()
+
+
+# --- POOL COMPARTIDO ---
+def obtener_pool():
+    """Pool de procesos único para todo el proceso (páginas de PDF, informes)."""
+    # "spawn" evita heredar los hilos del servidor de Streamlit
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=NUCLEOS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _descartar(pool):
+    # Un pool con un proceso muerto queda roto para siempre: se sustituye en la próxima petición
+    global _pool
+    with _lock:
+        if _pool is pool: _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def mapear(funcion, tareas, chunksize=1, en_proceso=None):
+    """``map`` de ``funcion`` sobre ``tareas`` en el pool compartido, en orden.
+
+    Si muere un proceso, lo que falta se repite una vez con un pool nuevo; si vuelve a
+    romperse, se termina en este proceso con ``en_proceso(resto)`` (por defecto, ``map``).
+    """
+    tareas, hechas = list(tareas), 0
+    for _ in range(2):
+        pool = obtener_pool()
+        try:
+            for resultado in pool.map(funcion, tareas[hechas:], chunksize=chunksize):
+                yield resultado
+                hechas += 1
+            return
+        except BrokenProcessPool:
+            _descartar(pool)
+    yield from (en_proceso or (lambda resto: map(funcion, resto)))(tareas[hechas:])
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import estadisticas
+from benchmarks import generar_actas
+
+
+def test_detectar_cambios_devuelve_la_nota_escrita():
+    est = estadisticas._calcular(generar_actas.datos_sinteticos(10, 4))
+    editada = est.matriz.a_dataframe().copy()
+    editada.iat[0, 1] = 6.7  # el editor escribe con iat y conserva float32
+    editada.iat[1, 2] = np.nan
+    cambios = estadisticas.detectar_cambios(est.matriz, editada)
+    assert cambios[0] == (est.matriz.alumnos[0], est.matriz.materias[1], 6.7)
+    assert cambios[1][:2] == (est.matriz.alumnos[1], est.matriz.materias[2]) and np.isnan(cambios[1][2])
+
+def _comparar(est, ref):
+    orden = lambda d, k: d.sort_values(k).reset_index(drop=True)
+    pd.testing.assert_frame_equal(orden(est.stats_al, 'Alumno'), orden(ref.stats_al, 'Alumno'), check_dtype=False)
+    pd.testing.assert_frame_equal(est.stats_mat.reset_index(drop=True), ref.stats_mat.reset_index(drop=True), check_dtype=False)
+    assert est.res.keys() == ref.res.keys()
+    for k, v in ref.res.items():
+        assert est.res[k] == (v if isinstance(v, str) else pytest.approx(v, nan_ok=True)), k
+    assert list(est.orden_alumnos) == list(ref.orden_alumnos)
+    np.testing.assert_array_equal(est.matriz.a_dataframe().reindex(index=ref.matriz.alumnos, columns=ref.matriz.materias),
+                                  ref.matriz.a_dataframe())
+
+def test_aplicar_cambios_equivale_a_recalcular():
+    datos = generar_actas.datos_sinteticos(12, 5)
+    alumnos, materias = list(dict.fromkeys(datos['Alumno'])), sorted(datos['Materia'].unique())
+    # Una celda vacía de partida, para añadir una nota nueva
+    datos = datos[~((datos['Alumno'] == alumnos[3]) & (datos['Materia'] == materias[0]))]
+    est = estadisticas._calcular(datos)
+    nombres = est.matriz.alumnos
+    cambios = [(nombres[0], materias[1], 2.5),                       # nota cambiada (pasa a suspenso)
+               (nombres[1], materias[2], np.nan),                    # celda borrada
+               (nombres[3], materias[0], 7.25)]                      # celda vacía que recibe nota
+    cambios += [(nombres[5], m, np.nan) for m in materias]           # alumno sin ninguna nota
+    cambios += [(al, materias[4], np.nan) for al in nombres if al != nombres[5]]  # materia vacía
+    nuevo = estadisticas.aplicar_cambios(est, cambios)
+
+    ref = estadisticas._calcular(nuevo.df[['Alumno', 'Materia', 'Nota']])
+    assert nombres[5] not in set(nuevo.stats_al['Alumno']) and materias[4] not in set(nuevo.stats_mat['Materia'])
+    _comparar(nuevo, ref)
+
+def test_aplicar_cambios_sin_cambios_devuelve_lo_mismo():
+    est = estadisticas._calcular(generar_actas.datos_sinteticos(5, 3))
+    assert estadisticas.aplicar_cambios(est, []) is est
@@ -0,0 +1,29 @@
+from extraccion import _leer_tabla
+
+MATERIAS = ["MAT", "LEN", "ING", "HIS", "BIO", "FIS", "EF", "MUS"]
+
+
+def _tabla(cabecera_orden, inicio=1):
+    filas = [[cabecera_orden, "Alumno/a", *MATERIAS]]
+    for i in range(15):
+        filas.append([str(inicio + i), f"APELLIDO{i}, NOMBRE", *(str((i + k) % 10 + 1) for k in range(len(MATERIAS)))])
+    return filas
+
+def test_columna_de_orden_no_es_materia():
+    for cabecera in ("Nº", "N.º", "Orden", ""):
+        resultado, confianza = _leer_tabla(_tabla(cabecera))
+        assert {m for _, m, _ in resultado} == set(MATERIAS), cabecera
+        assert len(resultado) == 15 * len(MATERIAS) and confianza == 1.0
+
+def test_numeracion_que_sigue_de_otra_pagina():
+    resultado, _ = _leer_tabla(_tabla("", inicio=16))
+    assert {m for _, m, _ in resultado} == set(MATERIAS)
+
+def test_materia_con_notas_consecutivas_se_conserva():
+    filas = [["Alumno/a", "MAT", "LEN", "ING"],
+             ["GARCIA LOPEZ, ANA", "5", "7", "8"],
+             ["MARTIN GIL, LUIS", "6", "4", "9"],
+             ["PEREZ RUIZ, EVA", "7", "9", "6"]]
+    resultado, confianza = _leer_tabla(filas)
+    assert [n for _, m, n in resultado if m == "MAT"] == [5, 6, 7]
+    assert len(resultado) == 9 and confianza == 1.0
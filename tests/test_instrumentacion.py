@@ -0,0 +1,16 @@
+from types import SimpleNamespace
+
+import instrumentacion
+
+
+def test_contadores_no_bajan_al_descartar_detalle(monkeypatch):
+    monkeypatch.setattr(instrumentacion, "MAX_REGISTROS", 5)
+    reg = instrumentacion.Registro()
+    for _ in range(20):
+        with reg.etapa("lectura_pdf"): pass
+        reg.llamada("gpt-4o", "acta.pdf", SimpleNamespace(prompt_tokens=10, completion_tokens=5), 0.1)
+    assert len(reg.etapas) == len(reg.llamadas) == 5
+    texto = reg.a_prometheus()
+    assert 'analizador_actas_etapa_ejecuciones_total{etapa="lectura_pdf"} 20' in texto
+    assert 'analizador_actas_modelo_llamadas_total{modelo="gpt-4o"} 20' in texto
+    assert 'analizador_actas_modelo_tokens_total{modelo="gpt-4o",tipo="prompt"} 200' in texto
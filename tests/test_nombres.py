@@ -0,0 +1,26 @@
+import pandas as pd
+
+import estadisticas
+from benchmarks import generar_actas
+from nombres import unificar_alumnos
+
+
+def _alumnos(filas):
+    return unificar_alumnos(pd.DataFrame(filas, columns=['Alumno', 'Materia', 'Nota']))['Alumno'].nunique()
+
+def test_misma_clave_con_materias_comunes_no_se_une():
+    assert _alumnos([("GARCIA LOPEZ, ANA", "MAT", 3), ("GARCIA LOPEZ, ANA", "LEN", 4),
+                     ("LOPEZ GARCIA, ANA", "MAT", 9), ("LOPEZ GARCIA, ANA", "LEN", 9)]) == 2
+    assert _alumnos([("MARTIN, JOSE LUIS", "MAT", 3), ("MARTIN, LUIS JOSE", "MAT", 4)]) == 2
+    assert _alumnos([("DE LA CRUZ GIL, ANA", "MAT", 3), ("CRUZ GIL, ANA", "MAT", 4)]) == 2
+    assert _alumnos([("PEREZ, JUAN", "MAT", 3), ("PEREZ, JUAN", "LEN", 4), ("Pérez, Juan", "MAT", 5)]) == 2
+
+def test_variantes_de_un_alumno_se_unen():
+    assert _alumnos([("PÉREZ GARCÍA, JUAN", "MAT", 3), ("Juan Perez Garcia", "LEN", 4),
+                     ("Juan Peres Garcia", "HIS", 4), ("Juan Pérez", "ING", 5)]) == 1
+
+def test_datos_completos_conservan_los_alumnos():
+    assert estadisticas._calcular(generar_actas.datos_sinteticos(1200, 10)).res['total_alumnos'] == 1200
+    df = generar_actas.datos_sinteticos(300, 10)
+    df = pd.concat([df.assign(Alumno=df['Alumno'] + f" G{g}") for g in range(10)])
+    assert estadisticas._calcular(df).res['total_alumnos'] == 3000